@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DinedashappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dinedashapp'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from dinedashapp import signals
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from heapq import merge
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from dinedashapp.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    ArchivedReservation,
+    Order,
+    OrderItem,
+    Reservation,
+)
+
+
+def get_archive_cutoff(days=None):
+    """
+    Returns the date before which finished orders and reservations are archived.
+    """
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return now() - timedelta(days=days)
+
+
+def archive_orders(cutoff, batch_size):
+    """
+    Moves up to batch_size orders that were delivered before cutoff into the
+    archive tables. Returns the number of orders that were moved.
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(status=Order.OrderStatus.DELIVERED, date_delivered__lt=cutoff)
+            .order_by("id")[:batch_size]
+        )
+        if not orders:
+            return 0
+
+        ArchivedOrder.objects.bulk_create(
+            ArchivedOrder(
+                id=order.id,
+                user_id=order.user_id,
+                restaurant_id=order.restaurant_id,
+                total_cost=order.total_cost,
+                status=order.status,
+                date_placed=order.date_placed,
+                date_ready=order.date_ready,
+                date_accepted=order.date_accepted,
+                date_delivered=order.date_delivered,
+                accepted_by_id=order.accepted_by_id,
+            )
+            for order in orders
+        )
+        ids = [order.id for order in orders]
+        ArchivedOrderItem.objects.bulk_create(
+            ArchivedOrderItem(
+                order_id=order_id,
+                name=name,
+                quantity=quantity,
+                unit_price=unit_price,
+            )
+            for order_id, name, quantity, unit_price in OrderItem.objects.filter(
+                order_id__in=ids
+            ).values_list("order_id", "name", "quantity", "unit_price")
+        )
+        # The items, payments and rejections go with the orders.
+        Order.objects.filter(id__in=ids).delete()
+    return len(orders)
+
+
+def archive_reservations(cutoff, batch_size):
+    """
+    Moves up to batch_size reservations that ended before cutoff into the archive
+    table, whatever their status. Returns the number of reservations that were
+    moved.
+    """
+    with transaction.atomic():
+        reservations = list(
+            Reservation.objects.select_for_update()
+            .filter(end_date__lt=cutoff)
+            .order_by("id")[:batch_size]
+        )
+        if not reservations:
+            return 0
+
+        ArchivedReservation.objects.bulk_create(
+            ArchivedReservation(
+                id=reservation.id,
+                table_id=reservation.table_id,
+                restaurant_id=reservation.restaurant_id,
+                user_id=reservation.user_id,
+                start_date=reservation.start_date,
+                end_date=reservation.end_date,
+                number_of_guests=reservation.number_of_guests,
+                status=reservation.status,
+            )
+            for reservation in reservations
+        )
+        Reservation.objects.filter(
+            id__in=[reservation.id for reservation in reservations]
+        ).delete()
+    return len(reservations)
+
+
+def merge_history(active, archived, key, reverse=False):
+    """
+    Combines rows from an active table and its archive table into one list that is
+    sorted by key. Both querysets must already be sorted the same way.
+    """
+    return list(merge(active, archived, key=key, reverse=reverse))
@@ -0,0 +1,269 @@
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+from time import time_ns
+
+from django.core.cache import cache
+from django.utils.timezone import localtime, make_aware, now
+
+from dinedashapp.models import Reservation, Table
+from dinedashapp.schedule import get_weekly_schedule
+
+# Restaurants rarely change their tables, so instead of deleting the cached
+# availability for every day, the version number in the cache keys is increased.
+TABLES_VERSION_KEY = "table_availability_version:{restaurant_id}"
+AVAILABILITY_KEY = "table_availability:{restaurant_id}:{version}:{day}"
+AVAILABILITY_TIMEOUT = 60 * 60
+
+# Available start times for reservations are offered in these increments.
+TIME_SLOT_LENGTH = timedelta(minutes=15)
+
+
+class TableAvailability:
+    """
+    The reservations that occupy a restaurant's tables on a single day. For each
+    table, the reservations are sorted by their start dates, and the running maximum
+    of their end dates is kept so that checking whether a table is free only takes
+    a binary search.
+    """
+
+    def __init__(self, tables, reservations):
+        # Sorted by capacity so that tables that are too small can be skipped with
+        # a binary search.
+        self.tables = sorted(tables)
+        self.capacities = [capacity for capacity, _table_id in self.tables]
+
+        reservations_by_table = {}
+        for table_id, start_date, end_date, reservation_id in sorted(
+            reservations, key=lambda r: r[1]
+        ):
+            reservations_by_table.setdefault(table_id, []).append(
+                (start_date, end_date, reservation_id)
+            )
+
+        self.schedules = {
+            table_id: (
+                [start_date for start_date, _end_date, _id in intervals],
+                list(accumulate((end_date for _s, end_date, _id in intervals), max)),
+                intervals,
+            )
+            for table_id, intervals in reservations_by_table.items()
+        }
+
+    def has_tables(self):
+        return bool(self.tables)
+
+    def is_table_free(
+        self, table_id, start_date, end_date, ignored_reservation_id=None
+    ):
+        """Returns whether a table has no reservations that overlap [start, end)."""
+        if table_id not in self.schedules:
+            return True
+        start_dates, max_end_dates, intervals = self.schedules[table_id]
+        # Reservations before this index start before end_date.
+        index = bisect_left(start_dates, end_date)
+        if index == 0 or max_end_dates[index - 1] <= start_date:
+            return True
+        if ignored_reservation_id is None:
+            return False
+        # The reservation being modified may be the only overlapping one, and there
+        # are only ever a handful of reservations for a table on one day.
+        return not any(
+            other_end_date > start_date and reservation_id != ignored_reservation_id
+            for _s, other_end_date, reservation_id in intervals[:index]
+        )
+
+    def iter_free_table_ids(
+        self, number_of_guests, start_date, end_date, ignored_reservation_id=None
+    ):
+        return (
+            table_id
+            for _capacity, table_id in self.tables[
+                bisect_left(self.capacities, number_of_guests) :
+            ]
+            if self.is_table_free(
+                table_id, start_date, end_date, ignored_reservation_id
+            )
+        )
+
+    def get_free_table_ids(
+        self, number_of_guests, start_date, end_date, ignored_reservation_id=None
+    ):
+        """Returns the IDs of the tables that seat enough guests and are free."""
+        return list(
+            self.iter_free_table_ids(
+                number_of_guests, start_date, end_date, ignored_reservation_id
+            )
+        )
+
+    def has_free_table(self, number_of_guests, start_date, end_date):
+        return (
+            next(self.iter_free_table_ids(number_of_guests, start_date, end_date), None)
+            is not None
+        )
+
+
+def get_day_bounds(day):
+    return (
+        make_aware(datetime.combine(day, time.min)),
+        make_aware(datetime.combine(day + timedelta(days=1), time.min)),
+    )
+
+
+def get_availability_key(restaurant_id, day):
+    # The version starts at the current time so that if the cache ever evicts it,
+    # entries created under the old version won't be used again.
+    version = cache.get_or_set(
+        TABLES_VERSION_KEY.format(restaurant_id=restaurant_id), time_ns, None
+    )
+    return AVAILABILITY_KEY.format(
+        restaurant_id=restaurant_id, version=version, day=day.isoformat()
+    )
+
+
+def get_table_availability(restaurant_id, day):
+    key = get_availability_key(restaurant_id, day)
+    if (availability := cache.get(key)) is None:
+        day_start, day_end = get_day_bounds(day)
+        availability = TableAvailability(
+            Table.objects.filter(restaurant_id=restaurant_id).values_list(
+                "capacity", "id"
+            ),
+            # Canceled reservations don't occupy their tables.
+            Reservation.objects.filter(
+                restaurant_id=restaurant_id,
+                table__isnull=False,
+                start_date__lt=day_end,
+                end_date__gt=day_start,
+            )
+            .exclude(status=Reservation.ReservationStatus.CANCELED)
+            .values_list("table_id", "start_date", "end_date", "id"),
+        )
+        cache.set(key, availability, AVAILABILITY_TIMEOUT)
+    return availability
+
+
+def get_days(start_date, end_date):
+    """Returns the local dates that the interval [start_date, end_date) touches."""
+    day = localtime(start_date).date()
+    last_day = localtime(end_date - timedelta(microseconds=1)).date()
+    while day <= last_day:
+        yield day
+        day += timedelta(days=1)
+
+
+def get_free_table_ids(
+    restaurant_id,
+    number_of_guests,
+    start_date,
+    end_date,
+    ignored_reservation_id=None,
+    availabilities=None,
+):
+    """
+    Returns the IDs of the tables at a restaurant that can seat number_of_guests and
+    aren't reserved at any point in [start_date, end_date). availabilities can be a
+    dict of the days' TableAvailability that is reused between calls.
+    """
+    if availabilities is None:
+        availabilities = {}
+    table_ids = None
+    for day in get_days(start_date, end_date):
+        if day not in availabilities:
+            availabilities[day] = get_table_availability(restaurant_id, day)
+        free_on_day = availabilities[day].get_free_table_ids(
+            number_of_guests, start_date, end_date, ignored_reservation_id
+        )
+        table_ids = (
+            free_on_day
+            if table_ids is None
+            else [table_id for table_id in table_ids if table_id in free_on_day]
+        )
+    return table_ids or []
+
+
+def get_available_start_times(restaurant_id, day, number_of_guests, duration):
+    """
+    Returns the times on a given day at which a reservation for number_of_guests
+    could start, taking the restaurant's hours and its free tables into account.
+    Restaurants that haven't set up their tables only have their hours checked.
+    """
+    schedule = get_weekly_schedule(restaurant_id)
+    # The day's availability is only loaded from the cache once for all the slots.
+    availabilities = {day: get_table_availability(restaurant_id, day)}
+    has_tables = availabilities[day].has_tables()
+    earliest_start = now()
+
+    start_times = []
+    # Periods that started the day before may run past midnight.
+    for open_date, close_date in schedule.open_intervals(
+        day - timedelta(days=1)
+    ) + schedule.open_intervals(day):
+        start_date = open_date
+        while start_date + duration <= close_date:
+            if (
+                start_date >= earliest_start
+                and localtime(start_date).date() == day
+                and (
+                    not has_tables
+                    or get_free_table_ids(
+                        restaurant_id,
+                        number_of_guests,
+                        start_date,
+                        start_date + duration,
+                        availabilities=availabilities,
+                    )
+                )
+            ):
+                start_times.append(start_date)
+            start_date += TIME_SLOT_LENGTH
+    return start_times
+
+
+def invalidate_table_availability(restaurant_id, days=None):
+    """
+    Removes the cached availability for the given days, or for every day if the
+    restaurant's tables changed.
+    """
+    if days is None:
+        try:
+            cache.incr(TABLES_VERSION_KEY.format(restaurant_id=restaurant_id))
+        except ValueError:
+            # Nothing has been cached for this restaurant yet.
+            pass
+    else:
+        cache.delete_many([get_availability_key(restaurant_id, day) for day in days])
+
+
+def plan_table_assignments(tables, occupied_intervals, pending_reservations):
+    """
+    Assigns pending reservations to tables in a single pass. Reservations are
+    handled in order of their start dates (larger parties first when they start at
+    the same time), and each one gets the smallest table that seats its guests and
+    is free for its whole duration. tables contains (capacity, table ID) pairs, and
+    occupied_intervals contains (table ID, start date, end date) tuples for the
+    reservations that already have tables. Returns a list of (reservation, table ID)
+    pairs; reservations that couldn't be seated are left out.
+    """
+    tables = sorted(tables)
+    capacities = [capacity for capacity, _table_id in tables]
+    # Each table's reservations, sorted and never overlapping, so the reservation
+    # that starts last before an interval ends is the only one that can overlap it.
+    schedules = {table_id: [] for _capacity, table_id in tables}
+    for table_id, start_date, end_date in occupied_intervals:
+        insort(schedules[table_id], (start_date, end_date))
+
+    assignments = []
+    for reservation in sorted(
+        pending_reservations, key=lambda r: (r.start_date, -r.number_of_guests)
+    ):
+        for _capacity, table_id in tables[
+            bisect_left(capacities, reservation.number_of_guests) :
+        ]:
+            schedule = schedules[table_id]
+            index = bisect_left(schedule, (reservation.end_date,))
+            if index == 0 or schedule[index - 1][1] <= reservation.start_date:
+                insort(schedule, (reservation.start_date, reservation.end_date))
+                assignments.append((reservation, table_id))
+                break
+    return assignments
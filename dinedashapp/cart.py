@@ -0,0 +1,67 @@
+from dinedashapp.models import MenuItem
+
+CART_SESSION_KEY = "cart"
+
+
+class SessionCart:
+    """
+    Stores the items that a customer wants to order in their session, so that rows
+    for an order are only created once it's placed. The cart keeps a separate list of
+    items for each restaurant.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        # Sessions are serialized as JSON, so the IDs are stored as strings.
+        self.data = session.get(CART_SESSION_KEY, {})
+
+    def get_restaurant_ids(self):
+        return [int(restaurant_id) for restaurant_id in self.data]
+
+    def get_quantities(self, restaurant_id):
+        """Returns a dict that maps menu item IDs to quantities."""
+        return {
+            int(menu_item_id): quantity
+            for menu_item_id, quantity in self.data.get(str(restaurant_id), {}).items()
+        }
+
+    def set_quantities(self, restaurant_id, quantities):
+        """
+        Updates the quantities of the given menu item IDs. A quantity of zero removes
+        the menu item from the cart.
+        """
+        items = self.data.setdefault(str(restaurant_id), {})
+        for menu_item_id, quantity in quantities.items():
+            if quantity:
+                items[str(menu_item_id)] = quantity
+            else:
+                items.pop(str(menu_item_id), None)
+        if not items:
+            del self.data[str(restaurant_id)]
+        self.save()
+
+    def clear(self, restaurant_id):
+        if self.data.pop(str(restaurant_id), None) is not None:
+            self.save()
+
+    def get_menu_items(self, restaurant_id):
+        """
+        Returns a dict that maps the menu items in the cart to their quantities. Menu
+        items that were deleted after being added to the cart are left out.
+        """
+        quantities = self.get_quantities(restaurant_id)
+        if not quantities:
+            return {}
+        menu_items = MenuItem.objects.filter(
+            restaurant_id=restaurant_id, id__in=quantities.keys()
+        )
+        return {menu_item: quantities[menu_item.id] for menu_item in menu_items}
+
+    def save(self):
+        self.session[CART_SESSION_KEY] = self.data
+        self.session.modified = True
+
+
+def calc_total_cost(menu_items):
+    """Returns the total cost of a dict that maps menu items to quantities."""
+    return sum(menu_item.price * quantity for menu_item, quantity in menu_items.items())
@@ -0,0 +1,60 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils.timezone import now
+
+from dinedashapp.geo import get_cell
+from dinedashapp.models import DemandCell, Order
+
+
+def count_orders_by_cell(start_date):
+    """
+    Counts the orders placed since start_date by their restaurant's grid cell and
+    the local hour of the week when they were placed. The database counts them by
+    restaurant location, so only one row per location and hour is loaded, and
+    get_cell() puts the locations into cells exactly.
+    """
+    counts = Counter()
+    for x, y, weekday, hour, orders in (
+        Order.objects.filter(date_placed__gte=start_date)
+        .exclude(status=Order.OrderStatus.NOT_PLACED_YET)
+        .annotate(
+            weekday=ExtractIsoWeekDay("date_placed"),
+            hour=ExtractHour("date_placed"),
+        )
+        .values_list(
+            "restaurant__location_x_coordinate",
+            "restaurant__location_y_coordinate",
+            "weekday",
+            "hour",
+        )
+        .annotate(orders=Count("id"))
+        .order_by()
+    ):
+        counts[(*get_cell((x, y)), weekday, hour)] += orders
+    return [(*key, orders) for key, orders in counts.items()]
+
+
+def build_demand_cells(weeks):
+    """
+    Replaces the demand heatmap with the average number of orders per week over the
+    last few weeks. Returns the number of cells that were written.
+    """
+    cells = [
+        DemandCell(
+            cell_x=cell_x,
+            cell_y=cell_y,
+            hour_of_week=(weekday - 1) * 24 + hour,
+            average_orders=orders / weeks,
+        )
+        for cell_x, cell_y, weekday, hour, orders in count_orders_by_cell(
+            now() - timedelta(weeks=weeks)
+        )
+    ]
+    with transaction.atomic():
+        DemandCell.objects.all().delete()
+        DemandCell.objects.bulk_create(cells, batch_size=1000)
+    return len(cells)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from heapq import nsmallest
+from math import cos, radians
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils.timezone import now
+
+from dinedashapp.geo import get_distance_in_miles
+from dinedashapp.models import DeliveryContractorInfo, DispatchOffer, Order
+
+# An order is offered to this many contractors, one at a time, before anyone
+# can accept it.
+DISPATCH_CANDIDATES = 3
+OFFER_TIMEOUT = timedelta(minutes=2)
+DISPATCH_RADIUS_MILES = 10
+# Each order that a contractor is already delivering counts as this many more
+# miles of distance, so busy contractors are asked last.
+MILES_PER_ORDER_IN_TRANSIT = 2
+MILES_PER_DEGREE_OF_LATITUDE = 69.0
+
+
+def get_bounding_box(coordinates, miles):
+    """
+    Returns the (minimum, maximum) latitudes and longitudes of a box that contains
+    every point within the given distance of the coordinates.
+    """
+    latitude, longitude = (float(c) for c in coordinates)
+    latitude_delta = miles / MILES_PER_DEGREE_OF_LATITUDE
+    longitude_delta = miles / (
+        MILES_PER_DEGREE_OF_LATITUDE * max(cos(radians(latitude)), 0.01)
+    )
+    return (
+        (latitude - latitude_delta, latitude + latitude_delta),
+        (longitude - longitude_delta, longitude + longitude_delta),
+    )
+
+
+def rank_contractors(coordinates, limit):
+    """
+    Returns the IDs of up to limit contractors near the coordinates, best first.
+    Only the contractors inside a bounding box are loaded, so the work depends on
+    how many contractors are nearby rather than on how many there are in total.
+    """
+    latitude_range, longitude_range = get_bounding_box(
+        coordinates, DISPATCH_RADIUS_MILES
+    )
+    contractors = (
+        DeliveryContractorInfo.objects.filter(
+            location_x_coordinate__range=latitude_range,
+            location_y_coordinate__range=longitude_range,
+        )
+        .annotate(
+            orders_in_transit=Count(
+                "accepted_orders",
+                filter=Q(accepted_orders__status=Order.OrderStatus.IN_TRANSIT),
+            )
+        )
+        .values_list(
+            "id", "location_x_coordinate", "location_y_coordinate", "orders_in_transit"
+        )
+    )
+
+    scores = []
+    for contractor_id, x, y, orders_in_transit in contractors:
+        distance = get_distance_in_miles(coordinates, (x, y))
+        if distance <= DISPATCH_RADIUS_MILES:
+            scores.append(
+                (
+                    distance + MILES_PER_ORDER_IN_TRANSIT * orders_in_transit,
+                    contractor_id,
+                )
+            )
+    return [contractor_id for _score, contractor_id in nsmallest(limit, scores)]
+
+
+def dispatch_order(order_id, restaurant_coordinates):
+    """
+    Offers an order that just became ready to the best nearby contractors. Each
+    one gets OFFER_TIMEOUT to accept it before the next one is asked, and once
+    every offer has run out, the order is shown to all contractors.
+    """
+    contractor_ids = rank_contractors(restaurant_coordinates, DISPATCH_CANDIDATES)
+    if not contractor_ids:
+        return
+    start = now()
+    with transaction.atomic():
+        DispatchOffer.objects.bulk_create(
+            DispatchOffer(
+                order_id=order_id,
+                contractor_id=contractor_id,
+                rank=rank,
+                starts_at=start + rank * OFFER_TIMEOUT,
+                ends_at=start + (rank + 1) * OFFER_TIMEOUT,
+            )
+            for rank, contractor_id in enumerate(contractor_ids)
+        )
+        Order.objects.filter(pk=order_id).update(
+            dispatch_ends_at=start + len(contractor_ids) * OFFER_TIMEOUT
+        )
+
+
+def decline_offer(order_id, contractor):
+    """
+    Ends the contractor's current offer for an order, if there is one, and moves
+    the offers after it forward so the next contractor doesn't have to wait.
+    """
+    declined_at = now()
+    with transaction.atomic():
+        offer = (
+            DispatchOffer.objects.select_for_update()
+            .filter(
+                order_id=order_id,
+                contractor=contractor,
+                starts_at__lte=declined_at,
+                ends_at__gt=declined_at,
+            )
+            .first()
+        )
+        if offer is None:
+            return
+        time_left = offer.ends_at - declined_at
+        DispatchOffer.objects.filter(pk=offer.pk).update(ends_at=declined_at)
+        DispatchOffer.objects.filter(order_id=order_id, rank__gt=offer.rank).update(
+            starts_at=F("starts_at") - time_left, ends_at=F("ends_at") - time_left
+        )
+        Order.objects.filter(pk=order_id).update(
+            dispatch_ends_at=F("dispatch_ends_at") - time_left
+        )
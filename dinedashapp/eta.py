@@ -0,0 +1,112 @@
+from datetime import timedelta
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.timezone import now
+
+from dinedashapp.geo import get_distance_in_miles
+from dinedashapp.models import Order
+
+AVERAGE_SPEED_KEY = "average_delivery_speed"
+AVERAGE_SPEED_TIMEOUT = 60 * 60
+# The average speed is learned from up to SPEED_SAMPLES orders delivered in this
+# period, as long as there are enough of them.
+SPEED_HISTORY = timedelta(days=30)
+SPEED_SAMPLES = 1000
+MIN_SPEED_SAMPLES = 20
+MIN_SPEED_MPH = 5
+MAX_SPEED_MPH = 60
+
+# Estimates are only recomputed once a contractor has moved this far.
+MIN_MOVE_MILES = 0.1
+LAST_ESTIMATE_POSITION_KEY = "eta_position:{contractor_id}"
+
+
+def learn_average_speed():
+    """
+    Returns the average speed of recent deliveries, from the distance between the
+    restaurant and the customer and the time between acceptance and delivery, or
+    DELIVERY_SPEED_MPH if there aren't enough of them.
+    """
+    deliveries = (
+        Order.objects.filter(
+            status=Order.OrderStatus.DELIVERED,
+            date_accepted__isnull=False,
+            date_delivered__gt=F("date_accepted"),
+            date_delivered__gte=now() - SPEED_HISTORY,
+            # The distance can't be known if the customer's address wasn't found.
+            user__customer_info__location_x_coordinate__isnull=False,
+            user__customer_info__location_y_coordinate__isnull=False,
+        )
+        .order_by("-date_delivered")
+        .values_list(
+            "restaurant__location_x_coordinate",
+            "restaurant__location_y_coordinate",
+            "user__customer_info__location_x_coordinate",
+            "user__customer_info__location_y_coordinate",
+            "date_accepted",
+            "date_delivered",
+        )[:SPEED_SAMPLES]
+    )
+
+    miles = 0
+    hours = 0
+    samples = 0
+    for rx, ry, cx, cy, date_accepted, date_delivered in deliveries:
+        miles += get_distance_in_miles((rx, ry), (cx, cy))
+        hours += (date_delivered - date_accepted).total_seconds() / 3600
+        samples += 1
+    if samples < MIN_SPEED_SAMPLES:
+        return settings.DELIVERY_SPEED_MPH
+    return min(max(miles / hours, MIN_SPEED_MPH), MAX_SPEED_MPH)
+
+
+def get_average_speed():
+    return cache.get_or_set(
+        AVERAGE_SPEED_KEY, learn_average_speed, AVERAGE_SPEED_TIMEOUT
+    )
+
+
+def estimate_minutes_away(miles):
+    return ceil(miles / get_average_speed() * 60)
+
+
+def update_etas(contractor_id, coordinates, force=False):
+    """
+    Estimates the minutes away of the orders that a contractor is delivering from
+    their position. Unless force is set, nothing is done if they haven't moved
+    MIN_MOVE_MILES since the last estimate.
+    """
+    key = LAST_ESTIMATE_POSITION_KEY.format(contractor_id=contractor_id)
+    last_position = cache.get(key)
+    if (
+        not force
+        and last_position is not None
+        and get_distance_in_miles(last_position, coordinates) < MIN_MOVE_MILES
+    ):
+        return
+    cache.set(key, coordinates, None)
+
+    orders = [
+        Order(
+            id=order_id,
+            minutes_away=estimate_minutes_away(
+                get_distance_in_miles(coordinates, (x, y))
+            ),
+        )
+        # Orders going to customers whose address wasn't found are left without
+        # an estimate.
+        for order_id, x, y in Order.objects.filter(
+            accepted_by_id=contractor_id,
+            status=Order.OrderStatus.IN_TRANSIT,
+            user__customer_info__location_x_coordinate__isnull=False,
+            user__customer_info__location_y_coordinate__isnull=False,
+        ).values_list(
+            "id",
+            "user__customer_info__location_x_coordinate",
+            "user__customer_info__location_y_coordinate",
+        )
+    ]
+    Order.objects.bulk_update(orders, ["minutes_away"])
@@ -0,0 +1,164 @@
+import csv
+import json
+from heapq import merge
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from dinedashapp.models import ArchivedOrder, ArchivedReservation, Order, Reservation
+
+# Rows are loaded from the database this many at a time while an export streams.
+EXPORT_CHUNK_SIZE = 500
+
+ORDER_CSV_HEADER = (
+    "order",
+    "date placed",
+    "date delivered",
+    "status",
+    "customer",
+    "item",
+    "quantity",
+    "price per unit",
+    "total cost",
+)
+
+RESERVATION_CSV_HEADER = (
+    "reservation",
+    "start date",
+    "end date",
+    "status",
+    "customer",
+    "number of guests",
+    "table",
+)
+
+
+class Echo:
+    """A file-like object that returns what is written to it instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_orders(restaurant, start_date, end_date):
+    """
+    Yields a restaurant's placed orders in the order they were placed, including
+    archived ones. Only one chunk of orders is in memory at a time.
+    """
+
+    def get_orders(model):
+        orders = model.objects.filter(restaurant=restaurant).exclude(
+            status=Order.OrderStatus.NOT_PLACED_YET
+        )
+        if start_date is not None:
+            orders = orders.filter(date_placed__gte=start_date)
+        if end_date is not None:
+            orders = orders.filter(date_placed__lt=end_date)
+        return (
+            orders.select_related("user__customer_info")
+            .prefetch_related("items")
+            .order_by("date_placed", "id")
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+    return merge(
+        get_orders(ArchivedOrder),
+        get_orders(Order),
+        key=lambda order: (order.date_placed, order.id),
+    )
+
+
+def iter_reservations(restaurant, start_date, end_date):
+    """
+    Yields a restaurant's reservations in the order they start, including archived
+    ones. Only one chunk of reservations is in memory at a time.
+    """
+
+    def get_reservations(model):
+        reservations = model.objects.filter(restaurant=restaurant)
+        if start_date is not None:
+            reservations = reservations.filter(start_date__gte=start_date)
+        if end_date is not None:
+            reservations = reservations.filter(start_date__lt=end_date)
+        return (
+            reservations.select_related("user__customer_info", "table")
+            .order_by("start_date", "id")
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+    return merge(
+        get_reservations(ArchivedReservation),
+        get_reservations(Reservation),
+        key=lambda reservation: (reservation.start_date, reservation.id),
+    )
+
+
+def get_customer_name(obj):
+    return obj.user.customer_info.get_full_name()
+
+
+def order_to_dict(order):
+    return {
+        "order": order.id,
+        "date_placed": order.date_placed,
+        "date_delivered": order.date_delivered,
+        "status": order.get_status_display(),
+        "customer": get_customer_name(order),
+        "items": [
+            {
+                "name": item.name,
+                "quantity": item.quantity,
+                "price_per_unit": item.get_unit_price(),
+            }
+            for item in order.items.all()
+        ],
+        "total_cost": order.total_cost,
+    }
+
+
+def iter_order_csv_rows(orders):
+    """Yields one row for each item of each order."""
+    yield ORDER_CSV_HEADER
+    for order in orders:
+        for item in order.items.all():
+            yield (
+                order.id,
+                order.date_placed,
+                order.date_delivered,
+                order.get_status_display(),
+                get_customer_name(order),
+                item.name,
+                item.quantity,
+                item.get_unit_price(),
+                order.total_cost,
+            )
+
+
+def reservation_to_dict(reservation):
+    return {
+        "reservation": reservation.id,
+        "start_date": reservation.start_date,
+        "end_date": reservation.end_date,
+        "status": reservation.get_status_display(),
+        "customer": get_customer_name(reservation),
+        "number_of_guests": reservation.number_of_guests,
+        "table": reservation.table.local_id if reservation.table else None,
+    }
+
+
+def iter_reservation_csv_rows(reservations):
+    yield RESERVATION_CSV_HEADER
+    for reservation in reservations:
+        yield tuple(reservation_to_dict(reservation).values())
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    return (writer.writerow(row) for row in rows)
+
+
+def stream_json(records):
+    """Yields a JSON array one element at a time."""
+    yield "["
+    for index, record in enumerate(records):
+        yield ("," if index else "") + json.dumps(record, cls=DjangoJSONEncoder)
+    yield "]"
@@ -1,24 +1,32 @@
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 from django import forms
 from django.contrib.auth import authenticate
 from django.contrib.auth.forms import BaseUserCreationForm
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db import transaction
+from django.utils.timezone import localtime, make_aware
 from django.utils.timezone import now as datetime_now
 from geopy.exc import GeopyError
 
+from dinedashapp.availability import get_free_table_ids, get_table_availability
 from dinedashapp.geo import get_coordinates
 from dinedashapp.models import (
     CustomerInfo,
     DeliveryContractorInfo,
+    MenuItem,
+    OpeningHours,
     Order,
-    OrderItem,
+    Payment,
     Reservation,
     Restaurant,
     Table,
     User,
 )
+from dinedashapp.schedule import MINUTES_PER_DAY, get_weekly_schedule
 
 
 class AbstractLogInForm(forms.Form):
@@ -190,41 +198,9 @@ class DeliveryContractorRegistrationForm(AbstractUserCreationForm):
 
 
 class RestaurantInfoForm(forms.ModelForm):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field_name, field in self.fields.items():
-            if "_hour_" in field_name:
-                field.required = False
-
     def clean(self):
         super().clean()
 
-        for day in (
-            "sunday",
-            "monday",
-            "tuesday",
-            "wednesday",
-            "thursday",
-            "friday",
-            "saturday",
-        ):
-            if "open_hour_" + day not in self.cleaned_data:
-                raise ValidationError(
-                    f"The format of the opening hour for {day.capitalize()} is invalid."
-                )
-
-            if "close_hour_" + day not in self.cleaned_data:
-                raise ValidationError(
-                    f"The format of the closing hour for {day.capitalize()} is invalid."
-                )
-
-            if bool(self.cleaned_data["open_hour_" + day]) != bool(
-                self.cleaned_data["close_hour_" + day]
-            ):
-                raise ValidationError(
-                    "If you entered an opening time for a day of the week, make sure to also specify a closing time for said day."
-                )
-
         if (location := self.cleaned_data.get("location")) != self.initial["location"]:
             try:
                 match get_coordinates(location):
@@ -247,71 +223,76 @@ class RestaurantInfoForm(forms.ModelForm):
 
     class Meta:
         model = Restaurant
-        fields = (
-            "description",
-            "location",
-            "open_hour_sunday",
-            "close_hour_sunday",
-            "open_hour_monday",
-            "close_hour_monday",
-            "open_hour_tuesday",
-            "close_hour_tuesday",
-            "open_hour_wednesday",
-            "close_hour_wednesday",
-            "open_hour_thursday",
-            "close_hour_thursday",
-            "open_hour_friday",
-            "close_hour_friday",
-            "open_hour_saturday",
-            "close_hour_saturday",
-        )
+        fields = ("description", "location")
+
+
+class OpeningHoursForm(forms.ModelForm):
+    class Meta:
+        model = OpeningHours
+        fields = ("weekday", "open_time", "close_time")
 
     # Django seems to have a bug where the TIME_INPUT_FORMATS setting is not
     # recognized, which makes it necessary to set the input format manually.
-    open_hour_sunday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_sunday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_monday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_monday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_tuesday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_tuesday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_wednesday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
+    open_time = forms.TimeField(
+        label="Opening time",
+        input_formats=("%I:%M %p",),
+        widget=forms.TimeInput(format="%I:%M %p"),
     )
-    close_hour_wednesday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_thursday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_thursday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_friday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_friday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    open_hour_saturday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
-    )
-    close_hour_saturday = forms.TimeField(
-        input_formats=("%I:%M %p",), widget=forms.TimeInput(format="%I:%M %p")
+    close_time = forms.TimeField(
+        label="Closing time",
+        input_formats=("%I:%M %p",),
+        widget=forms.TimeInput(format="%I:%M %p"),
     )
 
 
+class BaseOpeningHoursFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+
+        # Each period is converted to minutes since the start of Monday, so that
+        # periods that run overnight can be compared with the ones on the next day.
+        periods = []
+        for form in self.forms:
+            if not form.cleaned_data or form.cleaned_data.get("DELETE"):
+                continue
+            open_time = form.cleaned_data["open_time"]
+            close_time = form.cleaned_data["close_time"]
+            start = (
+                form.cleaned_data["weekday"] * MINUTES_PER_DAY
+                + open_time.hour * 60
+                + open_time.minute
+            )
+            length = (
+                close_time.hour * 60
+                + close_time.minute
+                - open_time.hour * 60
+                - open_time.minute
+            ) % MINUTES_PER_DAY or MINUTES_PER_DAY
+            periods.append((start, start + length))
+
+        periods.sort()
+        # The last period is compared with the first one a week later so that
+        # Sunday night can be compared with Monday morning.
+        next_starts = [start for start, _end in periods[1:]] + [
+            start + 7 * MINUTES_PER_DAY for start, _end in periods[:1]
+        ]
+        if any(
+            next_start < end for (_start, end), next_start in zip(periods, next_starts)
+        ):
+            raise ValidationError("Some of the opening hours overlap.")
+
+
+OpeningHoursFormSet = forms.inlineformset_factory(
+    Restaurant,
+    OpeningHours,
+    form=OpeningHoursForm,
+    formset=BaseOpeningHoursFormSet,
+    extra=3,
+)
+
+
 class RegularAccountDetailsForm(forms.ModelForm):
     class Meta:
         model = CustomerInfo
@@ -373,23 +354,209 @@ class DeliveryAccountDetailsForm(forms.ModelForm):
         if self.cleaned_data.get("location") != self.initial["location"]:
             obj.location_x_coordinate = self.cleaned_data["location_x_coordinate"]
             obj.location_y_coordinate = self.cleaned_data["location_y_coordinate"]
+            obj.location_updated_at = None
         if commit:
             obj.save()
         return obj
 
 
-class CreateOrderItemForm(forms.ModelForm):
-    quantity = forms.IntegerField(min_value=1)
-
+class PlaceOrderForm(forms.ModelForm):
     class Meta:
-        model = OrderItem
-        fields = ("quantity",)
+        model = Payment
+        fields = (
+            "payment_method",
+            "cardholder_name",
+            "billing_address",
+            "card_number",
+            "expiration_month",
+            "expiration_year",
+            "cvv",
+        )
+
+    # A new token is sent with each copy of the form, so that submitting the same
+    # one twice only places one order.
+    placement_token = forms.UUIDField(widget=forms.HiddenInput())
+
+
+# The most of one menu item that can be in a cart.
+MAX_ITEM_QUANTITY = 99
+
+
+class CartItemForm(forms.Form):
+    quantity = forms.IntegerField(min_value=0, max_value=MAX_ITEM_QUANTITY)
+
+
+class CartChangesForm(forms.Form):
+    # A list of [menu item ID, quantity] pairs.
+    items = forms.JSONField()
+
+    def __init__(self, *args, **kwargs):
+        self.restaurant_id = kwargs.pop("restaurant_id")
+        super().__init__(*args, **kwargs)
+
+    def clean_items(self):
+        quantities = {}
+        for change in self.cleaned_data["items"] or ():
+            match change:
+                # JSON's true and false are parsed as bools, which are also ints.
+                case [int(menu_item_id), int(quantity)] if (
+                    not isinstance(menu_item_id, bool)
+                    and not isinstance(quantity, bool)
+                    and 0 <= quantity <= MAX_ITEM_QUANTITY
+                ):
+                    quantities[menu_item_id] = quantity
+                case _:
+                    raise ValidationError(
+                        "Each change must be a menu item ID followed by a quantity "
+                        f"from 0 to {MAX_ITEM_QUANTITY}."
+                    )
+
+        menu_items = MenuItem.objects.filter(
+            restaurant_id=self.restaurant_id, id__in=quantities.keys()
+        ).only("id", "name")
+        if len(menu_items) != len(quantities):
+            raise ValidationError("Some of the menu items could not be found.")
+
+        return {menu_item: quantities[menu_item.id] for menu_item in menu_items}
+
+
+MenuItemRowForm = forms.modelform_factory(
+    MenuItem, fields=("name", "price", "description")
+)
+
+
+class MenuImportForm(forms.Form):
+    """
+    Reads a CSV or JSON file of menu items. The CSV file needs a header with name,
+    price and description columns, and the JSON file must contain a list of objects
+    with those keys. Items are matched to the existing menu by name.
+    """
+
+    MAX_ROWS = 1000
+
+    file = forms.FileField(
+        help_text="A CSV or JSON file with name, price and description."
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.restaurant: Restaurant = kwargs.pop("restaurant")
+        super().__init__(*args, **kwargs)
+        # (row number, errors) pairs for the rows that are invalid.
+        self.row_errors = []
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        try:
+            text = file.read().decode("utf-8-sig")
+            if file.name.lower().endswith(".json"):
+                rows = json.loads(text)
+                if not isinstance(rows, list) or not all(
+                    isinstance(row, dict) for row in rows
+                ):
+                    raise ValueError
+            else:
+                rows = list(csv.DictReader(io.StringIO(text)))
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            raise ValidationError("The file could not be read.") from e
+
+        if not rows:
+            raise ValidationError("The file doesn't contain any menu items.")
+        if len(rows) > self.MAX_ROWS:
+            raise ValidationError(
+                f"Up to {self.MAX_ROWS} menu items can be imported at a time."
+            )
+
+        items = []
+        seen_names = set()
+        for row_number, row in enumerate(rows, start=1):
+            row_form = MenuItemRowForm(row)
+            if not row_form.is_valid():
+                self.row_errors.append((row_number, row_form.errors))
+            elif (name := row_form.cleaned_data["name"]) in seen_names:
+                self.row_errors.append(
+                    (row_number, {"name": ["This name appears more than once."]})
+                )
+            else:
+                seen_names.add(name)
+                items.append(row_form.cleaned_data)
+
+        if self.row_errors:
+            raise ValidationError(
+                "No menu items were imported because some rows are invalid."
+            )
+        return items
+
+    def save(self):
+        """
+        Creates the menu items that are new and updates the ones that already
+        exist, all in one transaction. Returns the number of items that were
+        created and updated.
+        """
+        items = self.cleaned_data["file"]
+        with transaction.atomic():
+            existing_items = {}
+            for menu_item in (
+                MenuItem.objects.select_for_update()
+                .filter(
+                    restaurant=self.restaurant,
+                    name__in=[item["name"] for item in items],
+                )
+                .order_by("id")
+            ):
+                existing_items.setdefault(menu_item.name, menu_item)
+
+            items_to_create = []
+            items_to_update = []
+            for item in items:
+                if (menu_item := existing_items.get(item["name"])) is None:
+                    items_to_create.append(MenuItem(restaurant=self.restaurant, **item))
+                else:
+                    menu_item.price = item["price"]
+                    menu_item.description = item["description"]
+                    items_to_update.append(menu_item)
+
+            MenuItem.objects.bulk_create(items_to_create)
+            MenuItem.objects.bulk_update(items_to_update, ["price", "description"])
+        return len(items_to_create), len(items_to_update)
 
 
 class OrdersWithinDistanceForm(forms.Form):
     max_distance = forms.IntegerField(label="Maximum distance (in miles)", min_value=1)
 
 
+class OrderIdsField(forms.Field):
+    """The IDs of several orders, sent as hidden inputs with the same name."""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(order_id) for order_id in value]
+        except (TypeError, ValueError):
+            raise ValidationError("Some of the orders could not be found.")
+
+
+class AcceptBundleForm(forms.Form):
+    order_id = OrderIdsField()
+
+
+class LiveLocationForm(forms.Form):
+    latitude = forms.FloatField(min_value=-90, max_value=90)
+    longitude = forms.FloatField(min_value=-180, max_value=180)
+
+
+class DemandHeatmapForm(forms.Form):
+    weekday = forms.TypedChoiceField(choices=OpeningHours.Weekday, coerce=int)
+    hour = forms.IntegerField(min_value=0, max_value=23)
+
+
+class OrdersFeedForm(forms.Form):
+    since = forms.DateTimeField(required=False)
+    max_distance = forms.IntegerField(required=False, min_value=1)
+
+
 class OrdersWithStatusForm(forms.Form):
     status = forms.TypedChoiceField(
         choices=(
@@ -412,6 +579,130 @@ class TableForm(forms.ModelForm):
         fields = ("local_id", "capacity")
 
 
+# The largest value that a PositiveSmallIntegerField can hold on every database.
+MAX_SMALL_INTEGER = 32767
+
+
+class FloorPlanTableForm(forms.Form):
+    id = forms.IntegerField(required=False, widget=forms.HiddenInput())
+    local_id = forms.IntegerField(
+        label="Table number", min_value=0, max_value=MAX_SMALL_INTEGER
+    )
+    capacity = forms.IntegerField(
+        label="Number of seats", min_value=1, max_value=MAX_SMALL_INTEGER
+    )
+
+
+class BaseFloorPlanFormSet(forms.BaseFormSet):
+    """
+    Edits all of a restaurant's tables at once. The submitted tables replace the
+    existing ones: changed tables are updated, new ones are created, and tables
+    that are left out or marked for deletion are deleted.
+    """
+
+    def __init__(self, *args, restaurant, **kwargs):
+        self.restaurant = restaurant
+        super().__init__(*args, **kwargs)
+
+    def get_tables(self):
+        """
+        Returns (ID, table number, capacity) tuples for the tables that will remain.
+        The ID of a new table is None.
+        """
+        return [
+            (
+                form.cleaned_data["id"],
+                form.cleaned_data["local_id"],
+                form.cleaned_data["capacity"],
+            )
+            for form in self.forms
+            # Extra forms that were left blank have no cleaned data.
+            if form.cleaned_data and not self._should_delete_form(form)
+        ]
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        existing_ids = set(
+            Table.objects.filter(restaurant=self.restaurant).values_list(
+                "id", flat=True
+            )
+        )
+        # Every table that will remain is in the formset, so duplicate numbers can
+        # be found without relying on the database to reject them.
+        table_ids = set()
+        local_ids = set()
+        for table_id, local_id, _capacity in self.get_tables():
+            if table_id is not None:
+                if table_id not in existing_ids or table_id in table_ids:
+                    raise ValidationError("Some of the tables could not be found.")
+                table_ids.add(table_id)
+            if local_id in local_ids:
+                raise ValidationError(f"There is more than one table #{local_id}.")
+            local_ids.add(local_id)
+
+    def save(self):
+        tables = self.get_tables()
+        with transaction.atomic():
+            existing_tables = {
+                table.id: table
+                for table in Table.objects.select_for_update().filter(
+                    restaurant=self.restaurant
+                )
+            }
+            kept_ids = {table_id for table_id, _l, _c in tables}
+            Table.objects.filter(id__in=existing_tables.keys() - kept_ids).delete()
+
+            tables_to_create = []
+            tables_to_update = []
+            renumbered_ids = []
+            for table_id, local_id, capacity in tables:
+                if table_id is None:
+                    tables_to_create.append(
+                        Table(
+                            restaurant=self.restaurant,
+                            local_id=local_id,
+                            capacity=capacity,
+                        )
+                    )
+                    continue
+                table = existing_tables[table_id]
+                if table.local_id != local_id:
+                    renumbered_ids.append(table_id)
+                if (table.local_id, table.capacity) != (local_id, capacity):
+                    table.local_id = local_id
+                    table.capacity = capacity
+                    tables_to_update.append(table)
+
+            if renumbered_ids:
+                # Tables may swap numbers, so the renumbered ones are first moved
+                # to numbers that aren't in use to satisfy the unique constraint
+                # after each statement. There are far fewer tables than numbers.
+                used_ids = {table.local_id for table in existing_tables.values()} | {
+                    local_id for _t, local_id, _c in tables
+                }
+                unused_ids = (
+                    local_id
+                    for local_id in range(MAX_SMALL_INTEGER + 1)
+                    if local_id not in used_ids
+                )
+                Table.objects.bulk_update(
+                    [
+                        Table(id=table_id, local_id=local_id)
+                        for table_id, local_id in zip(renumbered_ids, unused_ids)
+                    ],
+                    ["local_id"],
+                )
+            Table.objects.bulk_update(tables_to_update, ["local_id", "capacity"])
+            Table.objects.bulk_create(tables_to_create)
+
+
+FloorPlanFormSet = forms.formset_factory(
+    FloorPlanTableForm, formset=BaseFloorPlanFormSet, extra=3, can_delete=True
+)
+
+
 class CreateReservationForm(forms.ModelForm):
     class Meta:
         model = Reservation
@@ -438,118 +729,56 @@ class CreateReservationForm(forms.ModelForm):
         if start_date.date() < datetime_now().date():
             errors.append("Date must be today or in the future.")
 
-        match start_date.weekday():
-            case 0:
-                if self.restaurant.open_hour_monday is None:
-                    errors.append("Restaurant is closed on Mondays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Monday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Monday."
-                        )
-            case 1:
-                if self.restaurant.open_hour_tuesday is None:
-                    errors.append("Restaurant is closed on Tuesdays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Tuesday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Tuesday."
-                        )
-            case 2:
-                if self.restaurant.open_hour_wednesday is None:
-                    errors.append("Restaurant is closed on Wednesdays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Wednesday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Wednesday."
-                        )
-            case 3:
-                if self.restaurant.open_hour_thursday is None:
-                    errors.append("Restaurant is closed on Thursdays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Thursday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Thursday."
-                        )
-            case 4:
-                if self.restaurant.open_hour_friday is None:
-                    errors.append("Restaurant is closed on Fridays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Friday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Friday."
-                        )
-            case 5:
-                if self.restaurant.open_hour_saturday is None:
-                    errors.append("Restaurant is closed on Saturdays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Saturday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Saturday."
-                        )
-            case 6:
-                if self.restaurant.open_hour_sunday is None:
-                    errors.append("Restaurant is closed on Sundays.")
-                else:
-                    if start_date.time() < self.restaurant.open_hour_monday:
-                        errors.append(
-                            "Reservation should not start before the opening hour on Sunday."
-                        )
-                    if (
-                        end_date.time() > self.restaurant.close_hour_monday
-                        or start_date.date() != end_date.date()
-                    ):
-                        errors.append(
-                            "Reservation should not extend past the closing hour on Sunday."
-                        )
+        aware_start_date = make_aware(start_date)
+        aware_end_date = make_aware(end_date)
+        schedule = get_weekly_schedule(self.restaurant.id)
+        weekday = OpeningHours.Weekday(start_date.weekday())
+
+        if schedule.is_closed_on(weekday) and not schedule.is_open(aware_start_date):
+            errors.append(f"Restaurant is closed on {weekday.label}s.")
+        elif not schedule.is_open_throughout(aware_start_date, aware_end_date):
+            errors.append(
+                f"Reservation should start and end while the restaurant is open on {weekday.label}."
+            )
+
+        if not errors and not self.restaurant_can_seat_guests(
+            aware_start_date, aware_end_date
+        ):
+            errors.append(
+                "There are no tables available for that many guests at that time."
+            )
 
         if errors:
             raise ValidationError(errors)
 
         self.cleaned_data |= {"start_date": start_date, "end_date": end_date}
 
+    def restaurant_can_seat_guests(self, start_date, end_date):
+        # The field's own error is shown if the number of guests isn't valid.
+        if (number_of_guests := self.cleaned_data.get("number_of_guests")) is None:
+            return True
+        # Restaurants that haven't set up their tables can still accept reservations.
+        if not get_table_availability(
+            self.restaurant.id, localtime(start_date).date()
+        ).has_tables():
+            return True
+        return bool(
+            get_free_table_ids(
+                self.restaurant.id,
+                number_of_guests,
+                start_date,
+                end_date,
+            )
+        )
+
+
+class AvailableTimesForm(forms.Form):
+    # The names match the fields of CreateReservationForm so that the fields of that
+    # form can be sent to the view that uses this form.
+    number_of_guests = forms.IntegerField(min_value=1)
+    date = forms.DateField(widget=forms.SelectDateWidget())
+    minutes = forms.IntegerField(min_value=1)
+
 
 class ReservationsFilteringForm(forms.ModelForm):
     class Meta:
@@ -559,6 +788,49 @@ class ReservationsFilteringForm(forms.ModelForm):
     date = forms.DateField(required=False, widget=forms.SelectDateWidget())
 
 
+class AssignTablesForm(forms.Form):
+    first_date = forms.DateField(widget=forms.SelectDateWidget())
+    last_date = forms.DateField(widget=forms.SelectDateWidget())
+
+    def clean(self):
+        super().clean()
+        first_date = self.cleaned_data.get("first_date")
+        last_date = self.cleaned_data.get("last_date")
+        if first_date and last_date:
+            if first_date > last_date:
+                raise ValidationError(
+                    "The first date must not come after the last date."
+                )
+            if (last_date - first_date).days >= 31:
+                raise ValidationError(
+                    "Tables can be assigned for up to 31 days at a time."
+                )
+
+
+class ExportHistoryForm(forms.Form):
+    data = forms.ChoiceField(
+        choices=(("orders", "Orders"), ("reservations", "Reservations"))
+    )
+    file_format = forms.ChoiceField(choices=(("csv", "CSV"), ("json", "JSON")))
+    first_date = forms.DateField(required=False, widget=forms.SelectDateWidget())
+    last_date = forms.DateField(required=False, widget=forms.SelectDateWidget())
+
+    def clean(self):
+        super().clean()
+        first_date = self.cleaned_data.get("first_date")
+        last_date = self.cleaned_data.get("last_date")
+        if first_date and last_date and first_date > last_date:
+            raise ValidationError("The first date must not come after the last date.")
+
+
+class DashboardPeriodForm(forms.Form):
+    days = forms.TypedChoiceField(
+        choices=((7, "Last 7 days"), (30, "Last 30 days"), (90, "Last 90 days")),
+        coerce=int,
+        initial=30,
+    )
+
+
 class TableModelChoiceField(forms.ModelChoiceField):
     def label_from_instance(self, obj):
         return f"#{obj.local_id} ({obj.capacity} seats)"
@@ -576,18 +848,40 @@ class ModifyReservationForm(forms.ModelForm):
 
         reservation = self.instance
 
-        self.fields["table"].queryset = (
-            Table.objects.filter(
-                restaurant=reservation.restaurant,
-                capacity__gte=reservation.number_of_guests,
-            )
-            # Excludes all tables that have reservations whose start and end times
-            # overlap with this reservation. The tilde Q object is used so that this
-            # reservation is not included in the exclusion, thus allowing its table
-            # (if it already has a table associated with it) to be one of the choices.
-            .exclude(
-                ~Q(reservations__id=reservation.id),
-                reservations__start_date__lte=reservation.end_date,
-                reservations__end_date__gte=reservation.start_date,
+        # This reservation is ignored so that its table (if it already has a table
+        # associated with it) can be one of the choices.
+        self.fields["table"].queryset = Table.objects.filter(
+            id__in=get_free_table_ids(
+                reservation.restaurant_id,
+                reservation.number_of_guests,
+                reservation.start_date,
+                reservation.end_date,
+                ignored_reservation_id=reservation.id,
             )
         )
+
+    def clean_table(self):
+        """
+        Checks the table against the reservations in the database, since the cached
+        availability used for the choices may be out of date. The view calls this
+        in a transaction, so the table stays locked until the reservation is saved.
+        """
+        table = self.cleaned_data["table"]
+        if table is None or self.cleaned_data.get("status") == (
+            Reservation.ReservationStatus.CANCELED
+        ):
+            return table
+        Table.objects.select_for_update().get(pk=table.pk)
+        reservation = self.instance
+        if (
+            Reservation.objects.filter(
+                table=table,
+                start_date__lt=reservation.end_date,
+                end_date__gt=reservation.start_date,
+            )
+            .exclude(status=Reservation.ReservationStatus.CANCELED)
+            .exclude(pk=reservation.pk)
+            .exists()
+        ):
+            raise ValidationError("That table is already reserved at that time.")
+        return table
@@ -1,3 +1,6 @@
+from decimal import Decimal
+from math import floor
+
 from geopy.distance import geodesic
 from geopy.geocoders import Nominatim
 
@@ -11,3 +14,25 @@ def get_coordinates(location):
 
 def get_distance_in_miles(coordinate_1, coordinate_2):
     return geodesic(coordinate_1, coordinate_2).miles
+
+
+# Coordinates are grouped into the cells of a grid for the data that's computed
+# ahead of time. A cell is about 0.7 miles from north to south.
+CELL_SIZE_DEGREES = Decimal("0.01")
+
+
+def get_cell(coordinates):
+    """
+    Returns the (cell_x, cell_y) of the grid cell that contains the coordinates.
+    Cells are only ever computed here, with exact Decimal arithmetic, so that the
+    demand heatmap and the nearby restaurants use the same cells for a place.
+    """
+    return tuple(floor(Decimal(str(c)) / CELL_SIZE_DEGREES) for c in coordinates)
+
+
+def get_cell_center(cell_x, cell_y):
+    """Returns the coordinates of the center of a grid cell."""
+    return (
+        (cell_x + Decimal("0.5")) * CELL_SIZE_DEGREES,
+        (cell_y + Decimal("0.5")) * CELL_SIZE_DEGREES,
+    )
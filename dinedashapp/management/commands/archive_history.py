@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from dinedashapp.archive import archive_orders, archive_reservations, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves delivered orders and finished reservations that are older than "
+        "ARCHIVE_AFTER_DAYS days into the archive tables. Running it again picks up "
+        "where it left off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive rows older than this many days instead of the setting.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows to move in each transaction.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff(options["days"])
+        for name, archive in (
+            ("orders", archive_orders),
+            ("reservations", archive_reservations),
+        ):
+            total = 0
+            # Each batch is its own transaction, so the active tables are only
+            # locked briefly and an interrupted run loses nothing.
+            while moved := archive(cutoff, options["batch_size"]):
+                total += moved
+            self.stdout.write(f"Archived {total} {name}.")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from dinedashapp.demand import build_demand_cells
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the demand heatmap from the orders placed in the last few weeks, "
+        "grouped by the location of their restaurant and the hour of the week."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=8,
+            help="Number of weeks of orders to average over.",
+        )
+
+    def handle(self, *args, **options):
+        written = build_demand_cells(options["weeks"])
+        self.stdout.write(f"Wrote {written} demand heatmap cells.")
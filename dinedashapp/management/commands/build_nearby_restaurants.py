@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from dinedashapp.nearby import NEARBY_RESTAURANTS, build_nearby_restaurants
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the lists of restaurants that are recommended to customers because "
+        "they're close to where the customers live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=NEARBY_RESTAURANTS,
+            help="Number of restaurants to keep for each location.",
+        )
+
+    def handle(self, *args, **options):
+        cells = build_nearby_restaurants(options["count"])
+        self.stdout.write(f"Found the nearby restaurants of {cells} locations.")
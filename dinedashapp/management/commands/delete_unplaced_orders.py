@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from dinedashapp.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes orders that were never placed. Carts are now kept in the user's "
+        "session, so these orders are left over from before that change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of orders to delete at a time.",
+        )
+
+    def handle(self, *args, **options):
+        unplaced_orders = Order.objects.filter(
+            status=Order.OrderStatus.NOT_PLACED_YET
+        ).order_by("id")
+        total = 0
+        # Deleting in small batches keeps each transaction (and the time that the
+        # tables are locked) short.
+        while ids := list(
+            unplaced_orders.values_list("id", flat=True)[: options["batch_size"]]
+        ):
+            Order.objects.filter(id__in=ids).delete()
+            total += len(ids)
+        self.stdout.write(f"Deleted {total} unplaced orders.")
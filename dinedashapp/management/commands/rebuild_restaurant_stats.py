@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from dinedashapp.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the daily order totals shown on restaurant dashboards for the "
+        "last few days from the orders. The totals are normally kept up to date as "
+        "orders change, so this is only needed to fill them in for the first time or "
+        "after orders were changed by hand."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Number of days to recompute, counting today.",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_daily_stats(options["days"])
+        self.stdout.write(f"Wrote the totals of {written} restaurant days.")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:23
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_prices_of_placed_items(apps, schema_editor):
+    MenuItem = apps.get_model("dinedashapp", "MenuItem")
+    OrderItem = apps.get_model("dinedashapp", "OrderItem")
+    # The price paid for items in orders that were already placed wasn't recorded,
+    # so the current menu price is the closest thing available.
+    OrderItem.objects.exclude(order__status="Np").update(
+        unit_price=Subquery(
+            MenuItem.objects.filter(pk=OuterRef("menu_item_id")).values("price")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0019_table_reservation_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="unit_price",
+            field=models.DecimalField(
+                decimal_places=2,
+                max_digits=6,
+                null=True,
+                verbose_name="price per unit",
+            ),
+        ),
+        migrations.RunPython(
+            copy_prices_of_placed_items, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:31
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_names_of_menu_items(apps, schema_editor):
+    MenuItem = apps.get_model("dinedashapp", "MenuItem")
+    OrderItem = apps.get_model("dinedashapp", "OrderItem")
+    OrderItem.objects.update(
+        name=Subquery(
+            MenuItem.objects.filter(pk=OuterRef("menu_item_id")).values("name")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0020_orderitem_unit_price"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="orderitem",
+            options={"ordering": ["name"]},
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="name",
+            field=models.CharField(default="", max_length=200),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            copy_names_of_menu_items, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,218 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+def copy_opening_hours(apps, schema_editor):
+    OpeningHours = apps.get_model("dinedashapp", "OpeningHours")
+    Restaurant = apps.get_model("dinedashapp", "Restaurant")
+    opening_hours = []
+    for restaurant in Restaurant.objects.iterator():
+        for weekday, name in enumerate(WEEKDAYS):
+            open_time = getattr(restaurant, f"open_hour_{name}")
+            close_time = getattr(restaurant, f"close_hour_{name}")
+            if open_time is not None and close_time is not None:
+                opening_hours.append(
+                    OpeningHours(
+                        restaurant=restaurant,
+                        weekday=weekday,
+                        open_time=open_time,
+                        close_time=close_time,
+                    )
+                )
+    OpeningHours.objects.bulk_create(opening_hours)
+
+
+def restore_opening_hours(apps, schema_editor):
+    OpeningHours = apps.get_model("dinedashapp", "OpeningHours")
+    Restaurant = apps.get_model("dinedashapp", "Restaurant")
+    # The old columns only fit one period per day that doesn't run overnight, so
+    # the earliest such period is kept.
+    restaurants = {}
+    for hours in OpeningHours.objects.order_by("-open_time"):
+        if hours.open_time < hours.close_time:
+            restaurant = restaurants.setdefault(
+                hours.restaurant_id, Restaurant.objects.get(pk=hours.restaurant_id)
+            )
+            name = WEEKDAYS[hours.weekday]
+            setattr(restaurant, f"open_hour_{name}", hours.open_time)
+            setattr(restaurant, f"close_hour_{name}", hours.close_time)
+    for restaurant in restaurants.values():
+        restaurant.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0021_orderitem_name_alter_orderitem_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OpeningHours",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Monday"),
+                            (1, "Tuesday"),
+                            (2, "Wednesday"),
+                            (3, "Thursday"),
+                            (4, "Friday"),
+                            (5, "Saturday"),
+                            (6, "Sunday"),
+                        ]
+                    ),
+                ),
+                ("open_time", models.TimeField(verbose_name="opening time")),
+                ("close_time", models.TimeField(verbose_name="closing time")),
+            ],
+            options={
+                "verbose_name_plural": "opening hours",
+                "ordering": ["weekday", "open_time"],
+            },
+        ),
+        migrations.AddField(
+            model_name="openinghours",
+            name="restaurant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="opening_hours",
+                to="dinedashapp.restaurant",
+            ),
+        ),
+        migrations.RunPython(copy_opening_hours, reverse_code=restore_opening_hours),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="sunday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="monday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="tuesday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="wednesday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="thursday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="friday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="saturday_both_null_or_neither_null",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="sunday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="monday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="tuesday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="wednesday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="thursday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="friday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveConstraint(
+            model_name="restaurant",
+            name="saturday_open_hour_must_be_earlier_than_close_hour",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_friday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_monday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_saturday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_sunday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_thursday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_tuesday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="close_hour_wednesday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_friday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_monday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_saturday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_sunday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_thursday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_tuesday",
+        ),
+        migrations.RemoveField(
+            model_name="restaurant",
+            name="open_hour_wednesday",
+        ),
+    ]
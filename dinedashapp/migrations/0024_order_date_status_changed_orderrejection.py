@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_rejections(apps, schema_editor):
+    Order = apps.get_model("dinedashapp", "Order")
+    OrderRejection = apps.get_model("dinedashapp", "OrderRejection")
+    # The old table didn't record when orders were rejected.
+    OrderRejection.objects.bulk_create(
+        OrderRejection(order_id=order_id, contractor_id=contractor_id)
+        for order_id, contractor_id in Order.rejected_by.through.objects.values_list(
+            "order_id", "deliverycontractorinfo_id"
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0023_archivedorder_archivedorderitem_archivedreservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="date_status_changed",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "date_status_changed"],
+                name="dinedashapp_status_e85eee_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="OrderRejection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date_rejected",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="date rejected",
+                    ),
+                ),
+                (
+                    "contractor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rejections",
+                        to="dinedashapp.deliverycontractorinfo",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rejections",
+                        to="dinedashapp.order",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("order", "contractor"),
+                        name="at_most_one_rejection_per_order_per_contractor",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_rejections, reverse_code=migrations.RunPython.noop),
+        # A ManyToManyField can't be given a through model in place.
+        migrations.RemoveField(
+            model_name="order",
+            name="rejected_by",
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="rejected_by",
+            field=models.ManyToManyField(
+                related_name="rejected_orders",
+                through="dinedashapp.OrderRejection",
+                to="dinedashapp.deliverycontractorinfo",
+            ),
+        ),
+    ]
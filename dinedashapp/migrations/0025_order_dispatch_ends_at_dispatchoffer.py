@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0024_order_date_status_changed_orderrejection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="dispatch_ends_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.CreateModel(
+            name="DispatchOffer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("starts_at", models.DateTimeField()),
+                ("ends_at", models.DateTimeField()),
+                (
+                    "contractor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="offers",
+                        to="dinedashapp.deliverycontractorinfo",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="offers",
+                        to="dinedashapp.order",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["order", "rank"],
+            },
+        ),
+    ]
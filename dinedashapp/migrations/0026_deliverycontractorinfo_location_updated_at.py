@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0025_order_dispatch_ends_at_dispatchoffer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="deliverycontractorinfo",
+            name="location_updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
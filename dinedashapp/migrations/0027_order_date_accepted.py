@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0026_deliverycontractorinfo_location_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="date_accepted",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:56
+
+from django.db import migrations, models
+
+
+def purge_closed_order_rejections(apps, schema_editor):
+    OrderRejection = apps.get_model("dinedashapp", "OrderRejection")
+    DispatchOffer = apps.get_model("dinedashapp", "DispatchOffer")
+    # Only the rejections and offers of orders that are ready for pickup are used.
+    OrderRejection.objects.exclude(order__status="Rp").delete()
+    DispatchOffer.objects.exclude(order__status="Rp").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0027_order_date_accepted"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orderrejection",
+            index=models.Index(
+                fields=["contractor", "date_rejected"],
+                name="dinedashapp_contrac_6b4211_idx",
+            ),
+        ),
+        migrations.RunPython(purge_closed_order_rejections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0028_purge_closed_order_rejections"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DemandCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cell_x", models.IntegerField()),
+                ("cell_y", models.IntegerField()),
+                ("hour_of_week", models.PositiveSmallIntegerField()),
+                ("average_orders", models.FloatField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("hour_of_week", "cell_x", "cell_y"),
+                        name="one_demand_cell_per_hour_of_week",
+                    )
+                ],
+            },
+        ),
+    ]
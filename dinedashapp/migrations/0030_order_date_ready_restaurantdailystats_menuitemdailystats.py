@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0029_demandcell"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="date_ready",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.CreateModel(
+            name="MenuItemDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("name", models.CharField(max_length=200)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="menu_item_daily_stats",
+                        to="dinedashapp.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("restaurant", "day", "name"),
+                        name="one_menu_item_daily_stats_per_name_per_day",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RestaurantDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("orders", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                ("prepared_orders", models.PositiveIntegerField(default=0)),
+                ("preparation_seconds", models.PositiveBigIntegerField(default=0)),
+                ("delivered_orders", models.PositiveIntegerField(default=0)),
+                ("delivery_seconds", models.PositiveBigIntegerField(default=0)),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="dinedashapp.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["restaurant", "day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("restaurant", "day"),
+                        name="one_daily_stats_per_restaurant_per_day",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "dinedashapp",
+            "0030_order_date_ready_restaurantdailystats_menuitemdailystats",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NearbyRestaurant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cell_x", models.IntegerField()),
+                ("cell_y", models.IntegerField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("distance", models.FloatField(verbose_name="distance (in miles)")),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dinedashapp.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["cell_x", "cell_y", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cell_x", "cell_y", "rank"),
+                        name="one_nearby_restaurant_per_cell_per_rank",
+                    )
+                ],
+            },
+        ),
+    ]
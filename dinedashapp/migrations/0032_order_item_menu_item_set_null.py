@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0031_nearbyrestaurant"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderitem",
+            name="menu_item",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="orders",
+                to="dinedashapp.menuitem",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0032_order_item_menu_item_set_null"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="placement_token",
+            field=models.UUIDField(null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dinedashapp", "0033_order_placement_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedorder",
+            name="date_accepted",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedorder",
+            name="date_ready",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
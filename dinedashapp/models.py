@@ -8,8 +8,8 @@ from django.core.validators import (
     MinLengthValidator,
     MinValueValidator,
 )
-from django.db import models
-from django.db.models import Avg
+from django.db import models, transaction
+from django.db.models import Avg, Exists, F, OuterRef, Q
 from django.utils import timezone
 
 
@@ -94,23 +94,46 @@ class BlogPost(models.Model):
         ordering = ["-date"]
 
 
+class RestaurantQuerySet(models.QuerySet):
+    def open_at(self, at):
+        """
+        Filters the restaurants that are open at the given datetime. The check is
+        done in the database, and periods that started the day before and run
+        overnight are included.
+        """
+        at = timezone.localtime(at)
+        t = at.time()
+        overnight = Q(close_time__lte=F("open_time"))
+        started_today = Q(weekday=at.weekday(), open_time__lte=t) & (
+            Q(close_time__gt=t) | overnight
+        )
+        started_yesterday = (
+            Q(weekday=(at.weekday() - 1) % 7, close_time__gt=t) & overnight
+        )
+        return self.filter(
+            Exists(
+                OpeningHours.objects.filter(
+                    started_today | started_yesterday, restaurant=OuterRef("pk")
+                )
+            )
+        )
+
+    def with_is_favorite(self, user):
+        """Annotates whether each restaurant is one of the user's favorites."""
+        return self.annotate(
+            is_favorite=Exists(
+                Restaurant.favorited_by.through.objects.filter(
+                    restaurant=OuterRef("pk"), customerinfo__user=user
+                )
+            )
+        )
+
+
 class Restaurant(models.Model):
+    objects = RestaurantQuerySet.as_manager()
+
     name = models.CharField(max_length=200)
     description = models.CharField(max_length=1000)
-    open_hour_sunday = models.TimeField(null=True)
-    open_hour_monday = models.TimeField(null=True)
-    open_hour_tuesday = models.TimeField(null=True)
-    open_hour_wednesday = models.TimeField(null=True)
-    open_hour_thursday = models.TimeField(null=True)
-    open_hour_friday = models.TimeField(null=True)
-    open_hour_saturday = models.TimeField(null=True)
-    close_hour_sunday = models.TimeField(null=True)
-    close_hour_monday = models.TimeField(null=True)
-    close_hour_tuesday = models.TimeField(null=True)
-    close_hour_wednesday = models.TimeField(null=True)
-    close_hour_thursday = models.TimeField(null=True)
-    close_hour_friday = models.TimeField(null=True)
-    close_hour_saturday = models.TimeField(null=True)
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, related_name="restaurant"
     )
@@ -131,115 +154,36 @@ class Restaurant(models.Model):
     class Meta:
         ordering = ["name"]
 
-        constraints = [
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_sunday__isnull=True, close_hour_sunday__isnull=True
-                )
-                | models.Q(
-                    open_hour_sunday__isnull=False, close_hour_sunday__isnull=False
-                ),
-                name="sunday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_monday__isnull=True, close_hour_monday__isnull=True
-                )
-                | models.Q(
-                    open_hour_monday__isnull=False, close_hour_monday__isnull=False
-                ),
-                name="monday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_tuesday__isnull=True, close_hour_tuesday__isnull=True
-                )
-                | models.Q(
-                    open_hour_tuesday__isnull=False, close_hour_tuesday__isnull=False
-                ),
-                name="tuesday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_wednesday__isnull=True, close_hour_wednesday__isnull=True
-                )
-                | models.Q(
-                    open_hour_wednesday__isnull=False,
-                    close_hour_wednesday__isnull=False,
-                ),
-                name="wednesday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_thursday__isnull=True, close_hour_thursday__isnull=True
-                )
-                | models.Q(
-                    open_hour_thursday__isnull=False, close_hour_thursday__isnull=False
-                ),
-                name="thursday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_friday__isnull=True, close_hour_friday__isnull=True
-                )
-                | models.Q(
-                    open_hour_friday__isnull=False, close_hour_friday__isnull=False
-                ),
-                name="friday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_saturday__isnull=True, close_hour_saturday__isnull=True
-                )
-                | models.Q(
-                    open_hour_saturday__isnull=False, close_hour_saturday__isnull=False
-                ),
-                name="saturday_both_null_or_neither_null",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(open_hour_sunday__lt=models.F("close_hour_sunday")),
-                name="sunday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Sunday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(open_hour_monday__lt=models.F("close_hour_monday")),
-                name="monday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Monday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_tuesday__lt=models.F("close_hour_tuesday")
-                ),
-                name="tuesday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Tuesday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_wednesday__lt=models.F("close_hour_wednesday")
-                ),
-                name="wednesday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Wednesday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_thursday__lt=models.F("close_hour_thursday")
-                ),
-                name="thursday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Thursday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(open_hour_friday__lt=models.F("close_hour_friday")),
-                name="friday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Friday's opening hour must be earlier than its closing hour.",
-            ),
-            models.CheckConstraint(
-                condition=models.Q(
-                    open_hour_saturday__lt=models.F("close_hour_saturday")
-                ),
-                name="saturday_open_hour_must_be_earlier_than_close_hour",
-                violation_error_message="Saturday's opening hour must be earlier than its closing hour.",
-            ),
-        ]
+
+class OpeningHours(models.Model):
+    """
+    A period of time during which a restaurant is open. If close_time isn't later
+    than open_time, then the restaurant closes at close_time on the next day.
+    """
+
+    class Weekday(models.IntegerChoices):
+        # These match the values returned by date.weekday().
+        MONDAY = 0, "Monday"
+        TUESDAY = 1, "Tuesday"
+        WEDNESDAY = 2, "Wednesday"
+        THURSDAY = 3, "Thursday"
+        FRIDAY = 4, "Friday"
+        SATURDAY = 5, "Saturday"
+        SUNDAY = 6, "Sunday"
+
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="opening_hours"
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday)
+    open_time = models.TimeField("opening time")
+    close_time = models.TimeField("closing time")
+
+    def is_overnight(self):
+        return self.close_time <= self.open_time
+
+    class Meta:
+        ordering = ["weekday", "open_time"]
+        verbose_name_plural = "opening hours"
 
 
 class MenuItem(models.Model):
@@ -297,9 +241,74 @@ class DeliveryContractorInfo(models.Model):
     location = models.CharField("location", max_length=300)
     location_x_coordinate = models.DecimalField(max_digits=9, decimal_places=6)
     location_y_coordinate = models.DecimalField(max_digits=9, decimal_places=6)
+    # Set when the coordinates come from the contractor's live position rather than
+    # from their location.
+    location_updated_at = models.DateTimeField(null=True)
+
+
+class OrderQuerySet(models.QuerySet):
+    def transition(self, new_status, **fields):
+        """
+        Moves the matching orders to new_status with a single UPDATE that only
+        touches the status columns and the given fields. Orders whose current status
+        does not allow the transition are left alone. Returns the number of orders
+        that were updated.
+        """
+        fields.setdefault("date_status_changed", timezone.now())
+        allowed_sources = [
+            source
+            for source, targets in self.model.ALLOWED_TRANSITIONS.items()
+            if new_status in targets
+        ]
+        orders = self.filter(status__in=allowed_sources)
+        if Order.OrderStatus.READY_FOR_PICKUP not in allowed_sources:
+            return orders.update(status=new_status, **fields)
+
+        # Rejections and dispatch offers only matter while an order is waiting to be
+        # picked up, so they're deleted once it isn't. This keeps the rejections
+        # that available_to() has to exclude down to those of the open orders.
+        with transaction.atomic():
+            order_ids = list(orders.values_list("id", flat=True))
+            updated = orders.filter(pk__in=order_ids).update(
+                status=new_status, **fields
+            )
+            if updated:
+                closed_orders = Order.objects.filter(pk__in=order_ids).exclude(
+                    status=Order.OrderStatus.READY_FOR_PICKUP
+                )
+                OrderRejection.objects.filter(order__in=closed_orders).delete()
+                DispatchOffer.objects.filter(order__in=closed_orders).delete()
+        return updated
+
+    def available_to(self, contractor, at=None):
+        """
+        Filters the orders that the contractor can accept at the given time. While
+        an order is being dispatched, only the contractor whose offer is current
+        can accept it; afterwards, anyone who hasn't rejected it can.
+        """
+        if at is None:
+            at = timezone.now()
+        return (
+            self.filter(status=Order.OrderStatus.READY_FOR_PICKUP)
+            .exclude(rejections__contractor=contractor)
+            .filter(
+                Q(dispatch_ends_at__isnull=True)
+                | Q(dispatch_ends_at__lte=at)
+                | Exists(
+                    DispatchOffer.objects.filter(
+                        order=OuterRef("pk"),
+                        contractor=contractor,
+                        starts_at__lte=at,
+                        ends_at__gt=at,
+                    )
+                )
+            )
+        )
 
 
 class Order(models.Model):
+    objects = OrderQuerySet.as_manager()
+
     user = models.ForeignKey(User, related_name="orders", on_delete=models.CASCADE)
     restaurant = models.ForeignKey(
         Restaurant, related_name="orders", on_delete=models.CASCADE
@@ -313,12 +322,32 @@ class Order(models.Model):
         IN_TRANSIT = "It", "In transit"
         DELIVERED = "De", "Delivered"
 
+    ALLOWED_TRANSITIONS = {
+        OrderStatus.NOT_PLACED_YET: (OrderStatus.PLACED,),
+        OrderStatus.PLACED: (OrderStatus.READY_FOR_PICKUP,),
+        OrderStatus.READY_FOR_PICKUP: (OrderStatus.IN_TRANSIT,),
+        OrderStatus.IN_TRANSIT: (OrderStatus.DELIVERED,),
+        OrderStatus.DELIVERED: (),
+    }
+
     status = models.CharField(
         max_length=2, choices=OrderStatus, default=OrderStatus.NOT_PLACED_YET
     )
 
     date_placed = models.DateTimeField(null=True)
+    date_ready = models.DateTimeField(null=True)
+    # Used with date_delivered to learn how fast deliveries are, see eta.py.
+    date_accepted = models.DateTimeField(null=True)
     date_delivered = models.DateTimeField(null=True)
+    # Lets delivery contractors ask for only the orders that changed since they
+    # last checked.
+    date_status_changed = models.DateTimeField(null=True)
+    # When the last offer made by dispatch.dispatch_order() runs out. Until then,
+    # the order is only shown to the contractor whose offer is current.
+    dispatch_ends_at = models.DateTimeField(null=True)
+    # Sent with the form that places the order, so that the form can't be used to
+    # place a second order. See PlaceOrderView.
+    placement_token = models.UUIDField(null=True, unique=True)
 
     def calc_total_cost(self):
         if self.status == Order.OrderStatus.NOT_PLACED_YET:
@@ -331,8 +360,104 @@ class Order(models.Model):
             )["total_cost"]
         return self.total_cost
 
+    def set_item_quantities(self, quantities):
+        """
+        Applies several changes to the items in this unplaced order at once.
+        quantities maps menu items to their new quantities, and a quantity of zero
+        removes the menu item from the order.
+        """
+        with transaction.atomic():
+            existing_items = {
+                item.menu_item_id: item
+                for item in self.items.filter(menu_item__in=quantities.keys())
+            }
+            items_to_create = []
+            items_to_update = []
+            ids_of_items_to_delete = []
+
+            for menu_item, quantity in quantities.items():
+                item = existing_items.get(menu_item.id)
+                if item is None:
+                    if quantity:
+                        items_to_create.append(
+                            OrderItem(
+                                order=self,
+                                menu_item=menu_item,
+                                name=menu_item.name,
+                                quantity=quantity,
+                            )
+                        )
+                elif quantity:
+                    item.quantity = quantity
+                    items_to_update.append(item)
+                else:
+                    ids_of_items_to_delete.append(item.id)
+
+            if items_to_create:
+                OrderItem.objects.bulk_create(items_to_create)
+            if items_to_update:
+                OrderItem.objects.bulk_update(items_to_update, ["quantity"])
+            if ids_of_items_to_delete:
+                OrderItem.objects.filter(id__in=ids_of_items_to_delete).delete()
+
+    def place(self, payment):
+        """
+        Places this order and saves its payment in one transaction. The order's
+        items are locked while the total is computed, and the price of each item
+        is copied onto it so the total never has to be recalculated. Returns whether
+        the order was placed.
+        """
+        with transaction.atomic():
+            # Items that were removed from the menu can no longer be ordered.
+            self.items.filter(
+                menu_item__isnull=True, order__status=Order.OrderStatus.NOT_PLACED_YET
+            ).delete()
+            items = list(
+                self.items.select_for_update()
+                .select_related("menu_item")
+                .filter(order__status=Order.OrderStatus.NOT_PLACED_YET)
+            )
+            if not items:
+                return False
+
+            for item in items:
+                item.name = item.menu_item.name
+                item.unit_price = item.menu_item.price
+            OrderItem.objects.bulk_update(items, ["name", "unit_price"])
+
+            total_cost = sum(item.unit_price * item.quantity for item in items)
+            payment.order = self
+            payment.amount_paid = total_cost
+            payment.save()
+
+            if not self.transition_to(
+                Order.OrderStatus.PLACED,
+                total_cost=total_cost,
+                date_placed=timezone.now(),
+            ):
+                # Another request placed the order first, so the payment above
+                # must not be kept.
+                transaction.set_rollback(True)
+                return False
+        return True
+
+    def transition_to(self, new_status, **fields):
+        """
+        Moves this order to new_status without rewriting the rest of the row. The
+        in-memory object is only updated if the database accepted the transition.
+        """
+        applied = bool(
+            Order.objects.filter(pk=self.pk).transition(new_status, **fields)
+        )
+        if applied:
+            self.status = new_status
+            for name, value in fields.items():
+                setattr(self, name, value)
+        return applied
+
     class Meta:
         ordering = ["date_placed", "id"]
+        indexes = [models.Index(fields=["status", "date_status_changed"])]
 
     accepted_by = models.ForeignKey(
         DeliveryContractorInfo,
@@ -341,23 +466,82 @@ class Order(models.Model):
         related_name="accepted_orders",
     )
     rejected_by = models.ManyToManyField(
-        DeliveryContractorInfo, related_name="rejected_orders"
+        DeliveryContractorInfo,
+        related_name="rejected_orders",
+        through="OrderRejection",
     )
 
+    # Estimated by eta.update_etas() while the order is in transit.
     minutes_away = models.PositiveIntegerField(null=True)
 
 
+class OrderRejection(models.Model):
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="rejections"
+    )
+    contractor = models.ForeignKey(
+        DeliveryContractorInfo, on_delete=models.CASCADE, related_name="rejections"
+    )
+    date_rejected = models.DateTimeField("date rejected", default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Also used by available_to() to look up whether a contractor rejected
+            # an order.
+            models.UniqueConstraint(
+                fields=("order", "contractor"),
+                name="at_most_one_rejection_per_order_per_contractor",
+            )
+        ]
+        # For the rejections in the delivery feed.
+        indexes = [models.Index(fields=["contractor", "date_rejected"])]
+
+
+class DispatchOffer(models.Model):
+    """
+    A period of time during which only one delivery contractor can accept an
+    order. The offers for an order follow each other in order of rank.
+    """
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="offers")
+    contractor = models.ForeignKey(
+        DeliveryContractorInfo, on_delete=models.CASCADE, related_name="offers"
+    )
+    rank = models.PositiveSmallIntegerField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["order", "rank"]
+
+
 class OrderItem(models.Model):
+    # Placed orders keep their items when they're removed from the menu.
     menu_item = models.ForeignKey(
-        MenuItem, related_name="orders", on_delete=models.CASCADE
+        MenuItem, related_name="orders", on_delete=models.SET_NULL, null=True
     )
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField("quantity")
+    # These are copied from the menu item so that placed orders can be displayed
+    # without looking at the menu, which may have changed since then.
+    name = models.CharField(max_length=200)
+    unit_price = models.DecimalField(
+        "price per unit", max_digits=6, decimal_places=2, null=True
+    )
     date_placed = models.DateTimeField(null=True)
     date_delivered = models.DateTimeField(null=True)
 
+    def get_unit_price(self):
+        """
+        Returns the price that was paid for one of this item, or the current price
+        on the menu if the order hasn't been placed yet.
+        """
+        if self.unit_price is not None:
+            return self.unit_price
+        return self.menu_item.price if self.menu_item else None
+
     class Meta:
-        ordering = ["menu_item__name"]
+        ordering = ["name"]
         constraints = [
             models.UniqueConstraint(
                 fields=("menu_item", "order"),
@@ -448,3 +632,201 @@ class Reservation(models.Model):
                 violation_error_message="Start date must come before end date.",
             ),
         ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    A delivered order that was moved out of the Order table once it got old enough.
+    It keeps the ID of the original order so that links to it keep working. The
+    payment isn't kept, since the amount that was paid is the total cost.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, related_name="archived_orders", on_delete=models.CASCADE
+    )
+    restaurant = models.ForeignKey(
+        Restaurant, related_name="archived_orders", on_delete=models.CASCADE
+    )
+    total_cost = models.DecimalField(max_digits=6, decimal_places=2, null=True)
+    status = models.CharField(
+        max_length=2, choices=Order.OrderStatus, default=Order.OrderStatus.DELIVERED
+    )
+    date_placed = models.DateTimeField(null=True)
+    # Kept so that the restaurants' stats can be rebuilt from archived orders.
+    date_ready = models.DateTimeField(null=True)
+    date_accepted = models.DateTimeField(null=True)
+    date_delivered = models.DateTimeField(null=True)
+    accepted_by = models.ForeignKey(
+        DeliveryContractorInfo,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_orders",
+    )
+    date_archived = models.DateTimeField("date archived", default=timezone.now)
+
+    def calc_total_cost(self):
+        return self.total_cost
+
+    class Meta:
+        ordering = ["date_placed", "id"]
+
+
+class ArchivedOrderItem(models.Model):
+    order = models.ForeignKey(
+        ArchivedOrder, related_name="items", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField("quantity")
+    unit_price = models.DecimalField(
+        "price per unit", max_digits=6, decimal_places=2, null=True
+    )
+
+    def get_unit_price(self):
+        return self.unit_price
+
+    class Meta:
+        ordering = ["name"]
+
+
+class ArchivedReservation(models.Model):
+    """
+    A reservation that ended long enough ago to be moved out of the Reservation
+    table. It keeps the ID of the original reservation.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    table = models.ForeignKey(
+        Table,
+        on_delete=models.SET_NULL,
+        related_name="archived_reservations",
+        null=True,
+    )
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="archived_reservations"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_reservations"
+    )
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    number_of_guests = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=2, choices=Reservation.ReservationStatus)
+    date_archived = models.DateTimeField("date archived", default=timezone.now)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ["start_date"]
+
+
+class DemandCell(models.Model):
+    """
+    The average number of orders placed each week at the restaurants in one cell of
+    a grid, during one hour of the week. These are rebuilt from the orders by the
+    build_demand_heatmap command.
+    """
+
+    # The cell contains the coordinates whose latitude divided by the cell size
+    # rounds down to cell_x, and likewise for the longitude and cell_y.
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    # The hour of the week, starting at midnight on Monday.
+    hour_of_week = models.PositiveSmallIntegerField()
+    average_orders = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("hour_of_week", "cell_x", "cell_y"),
+                name="one_demand_cell_per_hour_of_week",
+            )
+        ]
+
+
+class RestaurantDailyStats(models.Model):
+    """
+    Totals for the orders that were placed at a restaurant on one day. They're
+    updated by rollups.py as orders are placed, made ready and delivered, so the
+    dashboard never has to aggregate the orders themselves.
+    """
+
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    day = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # The time between placing an order and it being ready for pickup.
+    prepared_orders = models.PositiveIntegerField(default=0)
+    preparation_seconds = models.PositiveBigIntegerField(default=0)
+    # The time between an order being ready for pickup and it being delivered.
+    delivered_orders = models.PositiveIntegerField(default=0)
+    delivery_seconds = models.PositiveBigIntegerField(default=0)
+
+    def get_average_preparation_minutes(self):
+        if self.prepared_orders:
+            return self.preparation_seconds / self.prepared_orders / 60
+        return None
+
+    def get_average_delivery_minutes(self):
+        if self.delivered_orders:
+            return self.delivery_seconds / self.delivered_orders / 60
+        return None
+
+    class Meta:
+        ordering = ["restaurant", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("restaurant", "day"),
+                name="one_daily_stats_per_restaurant_per_day",
+            )
+        ]
+
+
+class MenuItemDailyStats(models.Model):
+    """
+    How many of a menu item were ordered at a restaurant on one day. Items are
+    identified by the name they had when they were ordered.
+    """
+
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="menu_item_daily_stats"
+    )
+    day = models.DateField()
+    name = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("restaurant", "day", "name"),
+                name="one_menu_item_daily_stats_per_name_per_day",
+            )
+        ]
+
+
+class NearbyRestaurant(models.Model):
+    """
+    One of the restaurants closest to the center of a grid cell that customers live
+    in. These are rebuilt by the build_nearby_restaurants command.
+    """
+
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    # 0 for the closest restaurant.
+    rank = models.PositiveSmallIntegerField()
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="+"
+    )
+    distance = models.FloatField("distance (in miles)")
+
+    class Meta:
+        ordering = ["cell_x", "cell_y", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("cell_x", "cell_y", "rank"),
+                name="one_nearby_restaurant_per_cell_per_rank",
+            )
+        ]
@@ -0,0 +1,136 @@
+from heapq import heappush, heappushpop
+from math import cos, radians
+
+from django.db import transaction
+
+from dinedashapp.geo import get_cell, get_cell_center, get_distance_in_miles
+from dinedashapp.models import CustomerInfo, NearbyRestaurant, Restaurant
+
+NEARBY_RESTAURANTS = 10
+MILES_PER_DEGREE_OF_LATITUDE = 69.0
+
+
+def project(coordinates):
+    """
+    Returns the position of the coordinates in miles on a flat map, which is close
+    enough to find the nearest restaurants before their real distances are
+    computed.
+    """
+    latitude, longitude = (float(c) for c in coordinates)
+    return (
+        latitude * MILES_PER_DEGREE_OF_LATITUDE,
+        longitude * MILES_PER_DEGREE_OF_LATITUDE * cos(radians(latitude)),
+    )
+
+
+class KDTree:
+    """
+    A k-d tree of points on a flat map, each with a value, for finding the points
+    closest to a location without measuring the distance to every point.
+    """
+
+    def __init__(self, points):
+        # points contains ((x, y), value) pairs.
+        self.root = self.build(list(points), 0)
+
+    def build(self, points, axis):
+        if not points:
+            return None
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        return (
+            points[middle],
+            axis,
+            self.build(points[:middle], 1 - axis),
+            self.build(points[middle + 1 :], 1 - axis),
+        )
+
+    def nearest(self, position, k):
+        """Returns the values of the k points closest to position, closest first."""
+        # A max-heap of the closest points found so far, by squared distance.
+        closest = []
+
+        def visit(node):
+            if node is None:
+                return
+            ((x, y), value), axis, before, after = node
+            squared_distance = (x - position[0]) ** 2 + (y - position[1]) ** 2
+            entry = (-squared_distance, value)
+            if len(closest) < k:
+                heappush(closest, entry)
+            elif squared_distance < -closest[0][0]:
+                heappushpop(closest, entry)
+
+            offset = position[axis] - (x, y)[axis]
+            near, far = (before, after) if offset < 0 else (after, before)
+            visit(near)
+            # The other side can only have closer points if the splitting line is
+            # closer than the farthest point kept.
+            if len(closest) < k or offset**2 < -closest[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return [value for _distance, value in sorted(closest, reverse=True)]
+
+
+def build_nearby_restaurants(k=NEARBY_RESTAURANTS):
+    """
+    Replaces the lists of nearby restaurants with the k closest restaurants to each
+    grid cell that a customer lives in. Returns the number of cells.
+    """
+    tree = KDTree(
+        (project(coordinates), (restaurant_id, coordinates))
+        for restaurant_id, *coordinates in Restaurant.objects.values_list(
+            "id", "location_x_coordinate", "location_y_coordinate"
+        )
+    )
+    cells = {
+        get_cell(coordinates)
+        for coordinates in CustomerInfo.objects.filter(
+            location_x_coordinate__isnull=False, location_y_coordinate__isnull=False
+        )
+        .values_list("location_x_coordinate", "location_y_coordinate")
+        .distinct()
+    }
+
+    nearby_restaurants = []
+    for cell_x, cell_y in cells:
+        center = get_cell_center(cell_x, cell_y)
+        # The tree finds the candidates with the projection, but they're ranked by
+        # the geodesic distance that's shown next to them.
+        candidates = sorted(
+            (get_distance_in_miles(center, coordinates), restaurant_id)
+            for restaurant_id, coordinates in tree.nearest(project(center), k)
+        )
+        for rank, (distance, restaurant_id) in enumerate(candidates):
+            nearby_restaurants.append(
+                NearbyRestaurant(
+                    cell_x=cell_x,
+                    cell_y=cell_y,
+                    rank=rank,
+                    restaurant_id=restaurant_id,
+                    distance=distance,
+                )
+            )
+
+    with transaction.atomic():
+        NearbyRestaurant.objects.all().delete()
+        NearbyRestaurant.objects.bulk_create(nearby_restaurants, batch_size=1000)
+    return len(cells)
+
+
+def get_nearby_restaurants(customer_info):
+    """
+    Returns the precomputed nearby restaurants for a customer's location, closest
+    first, along with their distances.
+    """
+    if customer_info.location_x_coordinate is None:
+        return NearbyRestaurant.objects.none()
+    cell_x, cell_y = get_cell(
+        (customer_info.location_x_coordinate, customer_info.location_y_coordinate)
+    )
+    return (
+        NearbyRestaurant.objects.filter(cell_x=cell_x, cell_y=cell_y)
+        .select_related("restaurant")
+        .order_by("rank")
+    )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import localdate
+
+from dinedashapp.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    MenuItemDailyStats,
+    Order,
+    OrderItem,
+    RestaurantDailyStats,
+)
+
+
+def add_to_daily_stats(restaurant_id, day, **amounts):
+    """Adds the amounts to a restaurant's totals for a day without reading them."""
+    stats, _created = RestaurantDailyStats.objects.get_or_create(
+        restaurant_id=restaurant_id, day=day
+    )
+    RestaurantDailyStats.objects.filter(pk=stats.pk).update(
+        **{name: F(name) + amount for name, amount in amounts.items()}
+    )
+
+
+def record_order_placed(order):
+    day = localdate(order.date_placed)
+    add_to_daily_stats(order.restaurant_id, day, orders=1, revenue=order.total_cost)
+
+    items = list(order.items.values_list("name", "quantity", "unit_price"))
+    MenuItemDailyStats.objects.bulk_create(
+        (
+            MenuItemDailyStats(restaurant_id=order.restaurant_id, day=day, name=name)
+            for name, _quantity, _unit_price in items
+        ),
+        ignore_conflicts=True,
+    )
+    for name, quantity, unit_price in items:
+        MenuItemDailyStats.objects.filter(
+            restaurant_id=order.restaurant_id, day=day, name=name
+        ).update(
+            quantity=F("quantity") + quantity,
+            revenue=F("revenue") + quantity * unit_price,
+        )
+
+
+def record_order_ready(order_id):
+    restaurant_id, date_placed, date_ready = Order.objects.values_list(
+        "restaurant_id", "date_placed", "date_ready"
+    ).get(pk=order_id)
+    add_to_daily_stats(
+        restaurant_id,
+        localdate(date_placed),
+        prepared_orders=1,
+        preparation_seconds=int((date_ready - date_placed).total_seconds()),
+    )
+
+
+def record_order_delivered(order_id):
+    restaurant_id, date_placed, date_ready, date_delivered = Order.objects.values_list(
+        "restaurant_id", "date_placed", "date_ready", "date_delivered"
+    ).get(pk=order_id)
+    # Orders that were made ready before date_ready existed can't be timed.
+    if date_ready is not None:
+        add_to_daily_stats(
+            restaurant_id,
+            localdate(date_placed),
+            delivered_orders=1,
+            delivery_seconds=int((date_delivered - date_ready).total_seconds()),
+        )
+
+
+def get_seconds(duration):
+    return int(duration.total_seconds()) if duration else 0
+
+
+def aggregate_daily_stats(orders):
+    has_date_ready = Q(date_ready__isnull=False)
+    is_delivered = Q(date_ready__isnull=False, date_delivered__isnull=False)
+    return (
+        orders.annotate(day=TruncDate("date_placed"))
+        .values("restaurant_id", "day")
+        .annotate(
+            orders=Count("id"),
+            revenue=Sum("total_cost", default=0),
+            prepared_orders=Count("id", filter=has_date_ready),
+            preparation=Sum(F("date_ready") - F("date_placed"), filter=has_date_ready),
+            delivered_orders=Count("id", filter=is_delivered),
+            delivery=Sum(F("date_delivered") - F("date_ready"), filter=is_delivered),
+        )
+        .order_by()
+    )
+
+
+def aggregate_menu_item_stats(items):
+    return (
+        items.annotate(day=TruncDate("order__date_placed"))
+        .values("order__restaurant_id", "day", "name")
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum(F("quantity") * F("unit_price")),
+        )
+        .order_by()
+    )
+
+
+def rebuild_daily_stats(days):
+    """
+    Recomputes the stats for the last few days from the orders, including archived
+    ones, in case they were changed without going through the functions above.
+    Returns the number of restaurant days that were written.
+    """
+    first_day = localdate() - timedelta(days=days - 1)
+    orders = Order.objects.exclude(status=Order.OrderStatus.NOT_PLACED_YET).filter(
+        date_placed__date__gte=first_day
+    )
+    archived_orders = ArchivedOrder.objects.filter(date_placed__date__gte=first_day)
+
+    daily_stats = {}
+    for row in [
+        *aggregate_daily_stats(orders),
+        *aggregate_daily_stats(archived_orders),
+    ]:
+        stats = daily_stats.setdefault(
+            (row["restaurant_id"], row["day"]),
+            RestaurantDailyStats(restaurant_id=row["restaurant_id"], day=row["day"]),
+        )
+        stats.orders += row["orders"]
+        stats.revenue += row["revenue"]
+        stats.prepared_orders += row["prepared_orders"]
+        stats.preparation_seconds += get_seconds(row["preparation"])
+        stats.delivered_orders += row["delivered_orders"]
+        stats.delivery_seconds += get_seconds(row["delivery"])
+
+    item_stats = {}
+    for row in [
+        *aggregate_menu_item_stats(OrderItem.objects.filter(order__in=orders)),
+        *aggregate_menu_item_stats(
+            ArchivedOrderItem.objects.filter(order__in=archived_orders)
+        ),
+    ]:
+        key = (row["order__restaurant_id"], row["day"], row["name"])
+        stats = item_stats.setdefault(
+            key,
+            MenuItemDailyStats(restaurant_id=key[0], day=key[1], name=key[2]),
+        )
+        stats.quantity += row["total_quantity"]
+        stats.revenue += row["total_revenue"] or 0
+
+    with transaction.atomic():
+        RestaurantDailyStats.objects.filter(day__gte=first_day).delete()
+        MenuItemDailyStats.objects.filter(day__gte=first_day).delete()
+        RestaurantDailyStats.objects.bulk_create(daily_stats.values(), batch_size=1000)
+        MenuItemDailyStats.objects.bulk_create(item_stats.values(), batch_size=1000)
+    return len(daily_stats)
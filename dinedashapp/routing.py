@@ -0,0 +1,193 @@
+from itertools import permutations
+
+from dinedashapp.geo import get_distance_in_miles
+
+# Orders are only bundled together if their restaurants are this close, so that
+# picking them all up is a short detour.
+BUNDLE_RADIUS_MILES = 1
+MAX_BUNDLE_SIZE = 3
+
+
+class Stop:
+    """A place where a delivery contractor picks up or drops off an order."""
+
+    def __init__(self, order_id, is_pickup, location, coordinates):
+        self.order_id = order_id
+        self.is_pickup = is_pickup
+        self.location = location
+        self.coordinates = coordinates
+
+
+def get_stops(order):
+    """Returns the stops of an order from get_orders_with_distances."""
+    return (
+        Stop(
+            order["id"],
+            True,
+            order["restaurant__location"],
+            (
+                order["restaurant__location_x_coordinate"],
+                order["restaurant__location_y_coordinate"],
+            ),
+        ),
+        Stop(
+            order["id"],
+            False,
+            order["user__customer_info__location"],
+            (
+                order["user__customer_info__location_x_coordinate"],
+                order["user__customer_info__location_y_coordinate"],
+            ),
+        ),
+    )
+
+
+def is_valid_route(stops):
+    """Returns whether every order is picked up before it's dropped off."""
+    picked_up = set()
+    for stop in stops:
+        if stop.is_pickup:
+            picked_up.add(stop.order_id)
+        elif stop.order_id not in picked_up:
+            return False
+    return True
+
+
+class RoutePlanner:
+    """
+    Plans the order in which to visit the stops of a few orders, starting from the
+    contractor's location. The distance between every pair of points is computed
+    once, since there are only ever a handful of stops.
+    """
+
+    def __init__(self, start, stops):
+        self.stops = list(stops)
+        points = [start] + [stop.coordinates for stop in self.stops]
+        self.distances = [[get_distance_in_miles(a, b) for b in points] for a in points]
+
+    def get_length(self, route):
+        """Returns the length of a route, which is a list of indexes into stops."""
+        length = 0
+        previous = 0
+        for index in route:
+            length += self.distances[previous][index + 1]
+            previous = index + 1
+        return length
+
+    def get_nearest_neighbor_route(self):
+        """
+        Always goes to the closest stop that can be visited next, that is, any
+        pickup that's left or the dropoff of an order that was already picked up.
+        """
+        route = []
+        picked_up = set()
+        remaining = set(range(len(self.stops)))
+        previous = 0
+        while remaining:
+            index = min(
+                (
+                    index
+                    for index in remaining
+                    if self.stops[index].is_pickup
+                    or self.stops[index].order_id in picked_up
+                ),
+                key=lambda index: self.distances[previous][index + 1],
+            )
+            if self.stops[index].is_pickup:
+                picked_up.add(self.stops[index].order_id)
+            remaining.remove(index)
+            route.append(index)
+            previous = index + 1
+        return route
+
+    def improve(self, route):
+        """
+        Reverses parts of the route (2-opt) for as long as that makes it shorter
+        without dropping off an order before picking it up.
+        """
+        length = self.get_length(route)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(route) - 1):
+                for j in range(i + 1, len(route)):
+                    candidate = route[:i] + route[i : j + 1][::-1] + route[j + 1 :]
+                    candidate_length = self.get_length(candidate)
+                    if candidate_length < length and is_valid_route(
+                        [self.stops[index] for index in candidate]
+                    ):
+                        route, length = candidate, candidate_length
+                        improved = True
+        return route, length
+
+    def plan(self):
+        """Returns the stops in the order they should be visited, and the length."""
+        route, length = self.improve(self.get_nearest_neighbor_route())
+        return [self.stops[index] for index in route], length
+
+    def get_one_at_a_time_length(self):
+        """
+        Returns the length of the shortest route that delivers each order before
+        picking up the next one. The stops must be pickups followed by their
+        dropoffs.
+        """
+        return min(
+            self.get_length(
+                [index for order in orders for index in (2 * order, 2 * order + 1)]
+            )
+            for orders in permutations(range(len(self.stops) // 2))
+        )
+
+
+def get_route_planner(start, orders):
+    return RoutePlanner(start, (stop for order in orders for stop in get_stops(order)))
+
+
+def suggest_bundles(orders, start, max_size=MAX_BUNDLE_SIZE):
+    """
+    Groups orders whose restaurants are close together into bundles that one
+    contractor can deliver on a single route starting at start. A bundle is only
+    suggested if its route is shorter than delivering its orders one at a time, and
+    each order is in at most one bundle. Returns a list of (orders, stops, length)
+    tuples, with the biggest savings first.
+    """
+    orders = sorted(orders, key=lambda o: o["restaurant_distance_away"])
+    restaurant_coordinates = {
+        o["id"]: (
+            o["restaurant__location_x_coordinate"],
+            o["restaurant__location_y_coordinate"],
+        )
+        for o in orders
+    }
+
+    bundles = []
+    bundled_ids = set()
+    for seed in orders:
+        if seed["id"] in bundled_ids:
+            continue
+        nearby = []
+        for o in orders:
+            if o["id"] == seed["id"] or o["id"] in bundled_ids:
+                continue
+            distance = get_distance_in_miles(
+                restaurant_coordinates[seed["id"]], restaurant_coordinates[o["id"]]
+            )
+            if distance <= BUNDLE_RADIUS_MILES:
+                nearby.append((distance, o))
+        nearby.sort(key=lambda n: n[0])
+        members = [seed] + [o for _distance, o in nearby[: max_size - 1]]
+
+        # The orders whose restaurants are farthest away are dropped from the
+        # bundle until it's worth it.
+        while len(members) > 1:
+            planner = get_route_planner(start, members)
+            stops, length = planner.plan()
+            saved = planner.get_one_at_a_time_length() - length
+            if saved > 0:
+                bundles.append((saved, members, stops, length))
+                bundled_ids.update(o["id"] for o in members)
+                break
+            members.pop()
+
+    bundles.sort(key=lambda bundle: -bundle[0])
+    return [(members, stops, length) for _saved, members, stops, length in bundles]
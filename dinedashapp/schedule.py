@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils.timezone import localtime, make_aware
+
+from dinedashapp.models import OpeningHours
+
+SCHEDULE_KEY = "weekly_schedule:{restaurant_id}"
+SCHEDULE_TIMEOUT = 24 * 60 * 60
+
+MINUTES_PER_DAY = 24 * 60
+
+# The order in which the days are shown on a restaurant's page.
+DISPLAY_ORDER = (
+    OpeningHours.Weekday.SUNDAY,
+    OpeningHours.Weekday.MONDAY,
+    OpeningHours.Weekday.TUESDAY,
+    OpeningHours.Weekday.WEDNESDAY,
+    OpeningHours.Weekday.THURSDAY,
+    OpeningHours.Weekday.FRIDAY,
+    OpeningHours.Weekday.SATURDAY,
+)
+
+
+def format_time(t):
+    return t.strftime("%I:%M %p").lstrip("0")
+
+
+class WeeklySchedule:
+    """
+    A restaurant's opening hours, grouped by the day of the week that each period
+    starts on. The text that describes each day is generated once so that pages
+    showing the hours don't have to format them again.
+    """
+
+    def __init__(self, opening_hours):
+        # opening_hours contains (weekday, open time, close time) tuples.
+        self.intervals = [[] for _weekday in OpeningHours.Weekday]
+        for weekday, open_time, close_time in sorted(opening_hours):
+            self.intervals[weekday].append((open_time, close_time))
+
+        self.descriptions = [
+            ", ".join(
+                f"{format_time(open_time)} to {format_time(close_time)}"
+                for open_time, close_time in intervals
+            )
+            or "closed"
+            for intervals in self.intervals
+        ]
+
+    def is_closed_on(self, weekday):
+        return not self.intervals[weekday]
+
+    def is_open(self, at):
+        """Returns whether the restaurant is open at the given datetime."""
+        at = localtime(at)
+        t = at.time()
+        weekday = at.weekday()
+        for open_time, close_time in self.intervals[weekday]:
+            if open_time <= t and (t < close_time or close_time <= open_time):
+                return True
+        # Periods that started the day before and run overnight.
+        for open_time, close_time in self.intervals[(weekday - 1) % 7]:
+            if close_time <= open_time and t < close_time:
+                return True
+        return False
+
+    def open_intervals(self, day):
+        """
+        Returns the (start, end) datetimes of the periods that start on the given
+        date. Periods that run overnight end on the following date.
+        """
+        result = []
+        for open_time, close_time in self.intervals[day.weekday()]:
+            end_day = day if open_time < close_time else day + timedelta(days=1)
+            result.append(
+                (
+                    make_aware(datetime.combine(day, open_time)),
+                    make_aware(datetime.combine(end_day, close_time)),
+                )
+            )
+        return result
+
+    def is_open_throughout(self, start_date, end_date):
+        """Returns whether [start_date, end_date) fits inside one opening period."""
+        day = localtime(start_date).date()
+        return any(
+            open_date <= start_date and end_date <= close_date
+            for d in (day - timedelta(days=1), day)
+            for open_date, close_date in self.open_intervals(d)
+        )
+
+    def get_descriptions(self):
+        """Returns (day name, hours) pairs, starting with Sunday."""
+        return [
+            (weekday.label, self.descriptions[weekday]) for weekday in DISPLAY_ORDER
+        ]
+
+
+def get_weekly_schedule(restaurant_id):
+    key = SCHEDULE_KEY.format(restaurant_id=restaurant_id)
+    if (schedule := cache.get(key)) is None:
+        schedule = WeeklySchedule(
+            OpeningHours.objects.filter(restaurant_id=restaurant_id).values_list(
+                "weekday", "open_time", "close_time"
+            )
+        )
+        cache.set(key, schedule, SCHEDULE_TIMEOUT)
+    return schedule
+
+
+def invalidate_weekly_schedule(restaurant_id):
+    cache.delete(SCHEDULE_KEY.format(restaurant_id=restaurant_id))
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from dinedashapp.availability import get_days, invalidate_table_availability
+from dinedashapp.models import OpeningHours, Reservation, Table
+from dinedashapp.schedule import invalidate_weekly_schedule
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_reservation_dates(sender, instance, update_fields=None, **kwargs):
+    """Keeps the dates a reservation had, so the days it's moved from are updated."""
+    instance.previous_dates = None
+    if instance.pk is None or (
+        update_fields is not None
+        and not {"start_date", "end_date"}.intersection(update_fields)
+    ):
+        return
+    instance.previous_dates = (
+        Reservation.objects.filter(pk=instance.pk)
+        .values_list("start_date", "end_date")
+        .first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def reservation_changed(sender, instance, **kwargs):
+    days = set(get_days(instance.start_date, instance.end_date))
+    if previous_dates := getattr(instance, "previous_dates", None):
+        days.update(get_days(*previous_dates))
+    invalidate_table_availability(instance.restaurant_id, days)
+
+
+@receiver([post_save, post_delete], sender=Table)
+def table_changed(sender, instance, **kwargs):
+    invalidate_table_availability(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=OpeningHours)
+def opening_hours_changed(sender, instance, **kwargs):
+    invalidate_weekly_schedule(instance.restaurant_id)
@@ -1,3 +1,346 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from dinedashapp.archive import archive_orders
+from dinedashapp.cart import CART_SESSION_KEY
+from dinedashapp.eta import learn_average_speed
+from dinedashapp.forms import (
+    MAX_ITEM_QUANTITY,
+    CartChangesForm,
+    ModifyReservationForm,
+)
+from dinedashapp.models import (
+    CustomerInfo,
+    DeliveryContractorInfo,
+    MenuItem,
+    NearbyRestaurant,
+    Order,
+    OrderItem,
+    OrderRejection,
+    Payment,
+    Reservation,
+    Restaurant,
+    RestaurantDailyStats,
+    Table,
+    User,
+)
+from dinedashapp.nearby import build_nearby_restaurants
+from dinedashapp.rollups import rebuild_daily_stats
+
+
+def create_user(email, user_type):
+    user = User(email=email, user_type=user_type)
+    user.set_password("password")
+    user.save()
+    return user
+
+
+def create_customer(email="customer@example.com", coordinates=(40.7, -74.0)):
+    user = create_user(email, "Reg")
+    CustomerInfo.objects.create(
+        user=user,
+        first_name="Ada",
+        last_name="Lovelace",
+        location="1 Main St" if coordinates else None,
+        location_x_coordinate=coordinates[0] if coordinates else None,
+        location_y_coordinate=coordinates[1] if coordinates else None,
+    )
+    return user
+
+
+def create_restaurant(email="restaurant@example.com"):
+    return Restaurant.objects.create(
+        user=create_user(email, "Res"),
+        name="Diner",
+        description="Food",
+        location="2 Main St",
+        location_x_coordinate=40.71,
+        location_y_coordinate=-74.0,
+    )
+
+
+def create_contractor(email="driver@example.com", coordinates=(40.7, -74.01)):
+    return DeliveryContractorInfo.objects.create(
+        user=create_user(email, "Del"),
+        first_name="Grace",
+        last_name="Hopper",
+        location="3 Main St",
+        location_x_coordinate=coordinates[0],
+        location_y_coordinate=coordinates[1],
+    )
+
+
+def get_payment(user):
+    return Payment(
+        user=user,
+        payment_method=Payment.PaymentMethods.CREDIT_CARD,
+        cardholder_name="Ada Lovelace",
+        card_number="4111111111111111",
+        expiration_month=1,
+        expiration_year=2040,
+        cvv="123",
+    )
+
+
+def place_order(user, restaurant, quantities):
+    order = Order.objects.create(user=user, restaurant=restaurant)
+    order.set_item_quantities(quantities)
+    order.place(get_payment(user))
+    return order
+
+
+class OrderItemTests(TestCase):
+    def test_deleting_menu_item_keeps_placed_orders(self):
+        customer = create_customer()
+        restaurant = create_restaurant()
+        burger = MenuItem.objects.create(
+            restaurant=restaurant, name="Burger", price=Decimal("8.50"), description=""
+        )
+        fries = MenuItem.objects.create(
+            restaurant=restaurant, name="Fries", price=Decimal("3.00"), description=""
+        )
+        order = place_order(customer, restaurant, {burger: 2, fries: 1})
+
+        burger.delete()
+
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+        self.client.force_login(customer)
+        response = self.client.get(reverse("manage_order", args=[order.id]))
+        self.assertContains(response, "Total cost: $20.00")
+        self.assertContains(response, "Burger")
+        self.assertContains(response, "2 for $8.50 each")
+
+
+class CartChangesFormTests(TestCase):
+    def setUp(self):
+        self.restaurant = create_restaurant()
+        self.menu_item = MenuItem.objects.create(
+            restaurant=self.restaurant, name="Soup", price=Decimal("4.00")
+        )
+
+    def get_form(self, items):
+        return CartChangesForm(
+            {"items": json.dumps(items)}, restaurant_id=self.restaurant.id
+        )
+
+    def test_valid_changes(self):
+        form = self.get_form([[self.menu_item.id, MAX_ITEM_QUANTITY]])
+        self.assertTrue(form.is_valid())
+        self.assertEqual(
+            form.cleaned_data["items"], {self.menu_item: MAX_ITEM_QUANTITY}
+        )
+
+    def test_bools_are_rejected(self):
+        MenuItem.objects.filter(pk=self.menu_item.pk).update(id=1)
+        self.assertTrue(self.get_form([[1, 1]]).is_valid())
+        self.assertFalse(self.get_form([[True, True]]).is_valid())
+        self.assertFalse(self.get_form([[1, True]]).is_valid())
+
+    def test_quantity_is_capped(self):
+        form = self.get_form([[self.menu_item.id, MAX_ITEM_QUANTITY + 1]])
+        self.assertFalse(form.is_valid())
+        self.assertFalse(self.get_form([[self.menu_item.id, 10**30]]).is_valid())
+
+
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        self.customer = create_customer()
+        self.restaurant = create_restaurant()
+        self.menu_item = MenuItem.objects.create(
+            restaurant=self.restaurant, name="Pie", price=Decimal("5.00")
+        )
+        self.client.force_login(self.customer)
+        self.url = reverse("place_order", args=[self.restaurant.id])
+
+    def fill_cart(self):
+        session = self.client.session
+        session[CART_SESSION_KEY] = {
+            str(self.restaurant.id): {str(self.menu_item.id): 2}
+        }
+        session.save()
+
+    def test_submitting_twice_places_one_order(self):
+        self.fill_cart()
+        response = self.client.get(self.url)
+        data = {
+            "payment_method": Payment.PaymentMethods.CREDIT_CARD,
+            "cardholder_name": "Ada Lovelace",
+            "billing_address": "1 Main St",
+            "card_number": "4111111111111111",
+            "expiration_month": 1,
+            "expiration_year": 2040,
+            "cvv": "123",
+            "placement_token": response.context["form"].initial["placement_token"],
+        }
+
+        first_response = self.client.post(self.url, data)
+        # The second submission read the session before the first one cleared it.
+        self.fill_cart()
+        second_response = self.client.post(self.url, data)
+
+        order = Order.objects.get()
+        self.assertEqual(Payment.objects.get().order, order)
+        self.assertEqual(order.total_cost, Decimal("10.00"))
+        self.assertRedirects(first_response, reverse("manage_order", args=[order.id]))
+        self.assertRedirects(second_response, reverse("manage_order", args=[order.id]))
+
+
+class ModifyReservationFormTests(TestCase):
+    def test_table_is_checked_against_the_database(self):
+        customer = create_customer()
+        restaurant = create_restaurant()
+        table = Table.objects.create(restaurant=restaurant, local_id=1, capacity=4)
+        start_date = now() + timedelta(days=1)
+        reservations = [
+            Reservation.objects.create(
+                restaurant=restaurant,
+                user=customer,
+                start_date=start_date,
+                end_date=start_date + timedelta(hours=1),
+                number_of_guests=2,
+            )
+            for _ in range(2)
+        ]
+        # Caches the availability, which another process then makes out of date by
+        # giving the table to the first reservation.
+        ModifyReservationForm(instance=reservations[1])
+        Reservation.objects.filter(pk=reservations[0].pk).update(table=table)
+
+        form = ModifyReservationForm(
+            data={"status": Reservation.ReservationStatus.CONFIRMED, "table": table.pk},
+            instance=reservations[1],
+        )
+        self.assertIn(table, form.fields["table"].queryset)
+        self.assertFalse(form.is_valid())
+        self.assertIn("table", form.errors)
+
+
+class RebuildDailyStatsTests(TestCase):
+    def test_archiving_keeps_preparation_and_delivery_times(self):
+        customer = create_customer()
+        restaurant = create_restaurant()
+        date_placed = now() - timedelta(days=2)
+        Order.objects.create(
+            user=customer,
+            restaurant=restaurant,
+            status=Order.OrderStatus.DELIVERED,
+            total_cost=Decimal("12.00"),
+            date_placed=date_placed,
+            date_ready=date_placed + timedelta(minutes=15),
+            date_accepted=date_placed + timedelta(minutes=20),
+            date_delivered=date_placed + timedelta(minutes=45),
+        )
+
+        def get_stats():
+            rebuild_daily_stats(7)
+            return list(
+                RestaurantDailyStats.objects.values_list(
+                    "orders",
+                    "revenue",
+                    "prepared_orders",
+                    "preparation_seconds",
+                    "delivered_orders",
+                    "delivery_seconds",
+                )
+            )
+
+        stats = get_stats()
+        self.assertEqual(stats, [(1, Decimal("12.00"), 1, 15 * 60, 1, 30 * 60)])
+        self.assertEqual(archive_orders(now(), 100), 1)
+        self.assertEqual(get_stats(), stats)
+
+
+class DeliveryOrdersFeedTests(TestCase):
+    def test_removed_orders(self):
+        customer = create_customer()
+        far_customer = create_customer("far@example.com", (34.05, -118.24))
+        restaurant = create_restaurant()
+        contractor = create_contractor()
+        since = now() - timedelta(minutes=1)
+
+        def create_taken_order(user):
+            return Order.objects.create(
+                user=user,
+                restaurant=restaurant,
+                status=Order.OrderStatus.IN_TRANSIT,
+                date_status_changed=now(),
+            )
+
+        # Rejected and then taken by someone else, so it's in two of the lists.
+        rejected_order = create_taken_order(customer)
+        OrderRejection.objects.create(order=rejected_order, contractor=contractor)
+        nearby_order = create_taken_order(customer)
+        create_taken_order(far_customer)
+        create_taken_order(create_customer("lost@example.com", coordinates=None))
+
+        self.client.force_login(contractor.user)
+        response = self.client.get(
+            reverse("delivery_orders_feed"),
+            {"since": since.isoformat(), "max_distance": 5},
+        )
+        self.assertEqual(
+            response.json()["removed"], sorted([rejected_order.id, nearby_order.id])
+        )
+
+
+class EtaTests(TestCase):
+    def test_customers_without_coordinates_are_skipped(self):
+        customer = create_customer()
+        lost_customer = create_customer("lost@example.com", coordinates=None)
+        restaurant = create_restaurant()
+        contractor = create_contractor()
+        orders = [
+            Order.objects.create(
+                user=user,
+                restaurant=restaurant,
+                status=Order.OrderStatus.IN_TRANSIT,
+                accepted_by=contractor,
+            )
+            for user in (customer, lost_customer)
+        ]
+        date_accepted = now() - timedelta(hours=1)
+        Order.objects.create(
+            user=lost_customer,
+            restaurant=restaurant,
+            status=Order.OrderStatus.DELIVERED,
+            date_accepted=date_accepted,
+            date_delivered=date_accepted + timedelta(minutes=30),
+        )
+        learn_average_speed()
+
+        self.client.force_login(contractor.user)
+        response = self.client.post(
+            reverse("update_delivery_location"),
+            {"latitude": 40.72, "longitude": -74.0},
+        )
+        self.assertEqual(response.status_code, 200)
+        for order in orders:
+            order.refresh_from_db()
+        self.assertIsNotNone(orders[0].minutes_away)
+        self.assertIsNone(orders[1].minutes_away)
+
+
+class NearbyRestaurantTests(TestCase):
+    def test_ranks_follow_the_stored_distances(self):
+        create_customer(coordinates=(60.0, 10.0))
+        # The first restaurant is closer on the flat map that's used to find the
+        # candidates, but the second one is closer on the globe.
+        for index, coordinates in enumerate([(60.0385, 10.247), (60.1125, 9.9163)]):
+            restaurant = create_restaurant(f"restaurant{index}@example.com")
+            restaurant.location_x_coordinate, restaurant.location_y_coordinate = (
+                coordinates
+            )
+            restaurant.save()
+
+        build_nearby_restaurants()
 
-# Create your tests here.
+        distances = list(
+            NearbyRestaurant.objects.order_by("rank").values_list("distance", flat=True)
+        )
+        self.assertEqual(len(distances), 2)
+        self.assertEqual(distances, sorted(distances))
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from dinedashapp.eta import update_etas
+from dinedashapp.models import DeliveryContractorInfo
+
+# Contractors' apps can send their position every few seconds, so the latest one is
+# only kept in the cache, and it's written to the database at most this often.
+LIVE_LOCATION_KEY = "live_location:{contractor_id}"
+LIVE_LOCATION_FLUSH_KEY = "live_location_flushed:{contractor_id}"
+LIVE_LOCATION_FLUSH_INTERVAL = timedelta(seconds=30)
+# A position that hasn't been updated for this long is no longer used.
+LIVE_LOCATION_TIMEOUT = timedelta(minutes=10)
+
+
+def get_live_coordinates(contractor):
+    """
+    Returns the contractor's latest position, or the coordinates of their account's
+    location if they haven't sent one recently.
+    """
+    coordinates = cache.get(LIVE_LOCATION_KEY.format(contractor_id=contractor.id))
+    if coordinates is None:
+        coordinates = (
+            contractor.location_x_coordinate,
+            contractor.location_y_coordinate,
+        )
+    return coordinates
+
+
+def set_live_location(contractor_id, coordinates):
+    """
+    Remembers a contractor's latest position. It's saved to the database, and the
+    ETAs of the orders they're delivering are updated, if that hasn't happened in
+    the last LIVE_LOCATION_FLUSH_INTERVAL.
+    """
+    cache.set(
+        LIVE_LOCATION_KEY.format(contractor_id=contractor_id),
+        coordinates,
+        LIVE_LOCATION_TIMEOUT.total_seconds(),
+    )
+    if cache.add(
+        LIVE_LOCATION_FLUSH_KEY.format(contractor_id=contractor_id),
+        True,
+        LIVE_LOCATION_FLUSH_INTERVAL.total_seconds(),
+    ):
+        flush_live_location(contractor_id, coordinates)
+
+
+def clear_live_location(contractor_id):
+    cache.delete_many(
+        [
+            LIVE_LOCATION_KEY.format(contractor_id=contractor_id),
+            LIVE_LOCATION_FLUSH_KEY.format(contractor_id=contractor_id),
+        ]
+    )
+
+
+def flush_live_location(contractor_id, coordinates):
+    latitude, longitude = coordinates
+    DeliveryContractorInfo.objects.filter(pk=contractor_id).update(
+        location_x_coordinate=latitude,
+        location_y_coordinate=longitude,
+        location_updated_at=now(),
+    )
+    update_etas(contractor_id, coordinates)
@@ -2,6 +2,7 @@ from django.urls import path
 
 from dinedashapp.views import (
     ChangeEmailView,
+    CartView,
     ChangePasswordView,
     CreateMenuItemView,
     CreateOrderItemView,
@@ -13,11 +14,12 @@ from dinedashapp.views import (
     DeliveryLogInView,
     DeliveryRegistrationView,
     EditDeliveryAccountDetailsView,
+    EditFloorPlanView,
     EditMenuItemView,
-    EditOrderItemView,
     EditRegularAccountDetailsView,
     EditRestaurantInfoView,
     EditReviewView,
+    ImportMenuView,
     ListOfReviewsView,
     ListOfTablesView,
     ManageOrder,
@@ -34,16 +36,25 @@ from dinedashapp.views import (
     RestaurantRegistrationView,
     RestaurantSearchView,
     about_us,
+    assign_tables,
+    available_reservation_times,
     blog,
     contact_us,
+    delivery_order_bundles,
+    delivery_orders_feed,
     delivery_orders_list,
+    demand_heatmap,
+    export_history,
     index,
     log_in_question,
     log_out,
     modify_reservation,
     regular_customer_orders_list,
     reservations_list,
+    restaurant_dashboard,
     restaurant_orders_list,
+    update_cart,
+    update_delivery_location,
 )
 
 urlpatterns = [
@@ -102,6 +113,7 @@ urlpatterns = [
         name="delete_restaurant_review",
     ),
     path("menu/create", CreateMenuItemView.as_view(), name="create_menu_item"),
+    path("menu/import", ImportMenuView.as_view(), name="import_menu"),
     path("menu/edit/<int:pk>", EditMenuItemView.as_view(), name="edit_menu_item"),
     path("account/change_email", ChangeEmailView.as_view(), name="change_email"),
     path(
@@ -129,16 +141,30 @@ urlpatterns = [
         CreateOrderItemView.as_view(),
         name="create_order_item",
     ),
-    path("order/edit/<int:pk>", EditOrderItemView.as_view(), name="edit_order_item"),
+    path("cart/<int:restaurant_id>", CartView.as_view(), name="cart"),
+    path(
+        "cart/<int:restaurant_id>/place", PlaceOrderView.as_view(), name="place_order"
+    ),
+    path("restaurant/<int:restaurant_id>/cart", update_cart, name="update_cart"),
     path("order/<int:pk>", ManageOrder.as_view(), name="manage_order"),
-    path("order/<int:order_id>/place", PlaceOrderView.as_view(), name="place_order"),
     path("orders/restaurant", restaurant_orders_list, name="restaurant_orders"),
     path("orders/delivery", delivery_orders_list, name="delivery_orders"),
+    path(
+        "orders/delivery/bundles", delivery_order_bundles, name="delivery_order_bundles"
+    ),
+    path(
+        "orders/delivery/location",
+        update_delivery_location,
+        name="update_delivery_location",
+    ),
+    path("orders/delivery/feed", delivery_orders_feed, name="delivery_orders_feed"),
+    path("orders/demand", demand_heatmap, name="demand_heatmap"),
     path(
         "orders/regular", regular_customer_orders_list, name="regular_customers_orders"
     ),
     path("tables", ListOfTablesView.as_view(), name="restaurant_tables"),
     path("tables/create", CreateTableView.as_view(), name="create_restaurant_table"),
+    path("tables/edit", EditFloorPlanView.as_view(), name="edit_floor_plan"),
     path("tables/<int:pk>", ModifyTableView.as_view(), name="modify_restaurant_table"),
     path(
         "tables/<int:pk>/delete",
@@ -150,6 +176,11 @@ urlpatterns = [
         CreateReservationView.as_view(),
         name="create_reservation",
     ),
+    path(
+        "restaurant/<int:restaurant_id>/reservation/available_times",
+        available_reservation_times,
+        name="available_reservation_times",
+    ),
     path(
         "reseveration/<int:pk>",
         ReservationDetailsView.as_view(),
@@ -161,6 +192,9 @@ urlpatterns = [
         name="regular_reservations",
     ),
     path("reservations", reservations_list, name="reservations"),
+    path("reservations/assign_tables", assign_tables, name="assign_tables"),
+    path("restaurant/export", export_history, name="export_history"),
+    path("restaurant/dashboard", restaurant_dashboard, name="restaurant_dashboard"),
     path(
         "reseveration/<int:reservation_id>/edit",
         modify_reservation,
@@ -1,16 +1,27 @@
-from functools import wraps
+from datetime import timedelta
+from functools import cached_property, wraps
+from uuid import uuid4
 
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.views import PasswordChangeView
 from django.core.exceptions import PermissionDenied
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg, Count, Q
+from django.core.mail import send_mail, send_mass_mail
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Exists, OuterRef, Q, Sum
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
 from django.urls import reverse, reverse_lazy
-from django.utils.timezone import make_aware
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, localdate, localtime, make_aware
 from django.utils.timezone import now as datetime_now
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -22,15 +33,49 @@ from django.views.generic import (
     View,
 )
 
+from dinedashapp.archive import merge_history
+from dinedashapp.availability import (
+    get_available_start_times,
+    get_day_bounds,
+    get_days,
+    invalidate_table_availability,
+    plan_table_assignments,
+)
+from dinedashapp.cart import SessionCart, calc_total_cost
+from dinedashapp.dispatch import decline_offer, dispatch_order
+from dinedashapp.eta import update_etas
+from dinedashapp.export import (
+    iter_order_csv_rows,
+    iter_orders,
+    iter_reservation_csv_rows,
+    iter_reservations,
+    order_to_dict,
+    reservation_to_dict,
+    stream_csv,
+    stream_json,
+)
 from dinedashapp.forms import (
-    CreateOrderItemForm,
+    AcceptBundleForm,
+    AssignTablesForm,
+    AvailableTimesForm,
+    CartChangesForm,
+    CartItemForm,
     CreateReservationForm,
+    DashboardPeriodForm,
     DeliveryAccountDetailsForm,
     DeliveryContractorLogInForm,
     DeliveryContractorRegistrationForm,
+    DemandHeatmapForm,
+    ExportHistoryForm,
+    FloorPlanFormSet,
+    LiveLocationForm,
+    MenuImportForm,
     ModifyReservationForm,
+    OpeningHoursFormSet,
+    OrdersFeedForm,
     OrdersWithinDistanceForm,
     OrdersWithStatusForm,
+    PlaceOrderForm,
     RegularAccountDetailsForm,
     RegularUserLogInForm,
     RegularUserRegistrationForm,
@@ -40,19 +85,36 @@ from dinedashapp.forms import (
     RestaurantRegistrationForm,
     TableForm,
 )
-from dinedashapp.geo import get_distance_in_miles
+from dinedashapp.geo import get_cell_center, get_distance_in_miles
 from dinedashapp.models import (
+    ArchivedOrder,
+    ArchivedReservation,
     BlogPost,
+    DemandCell,
     MenuItem,
+    MenuItemDailyStats,
     Order,
-    OrderItem,
     Payment,
     Reservation,
     Restaurant,
+    RestaurantDailyStats,
     RestaurantReview,
     Table,
     User,
 )
+from dinedashapp.nearby import get_nearby_restaurants
+from dinedashapp.rollups import (
+    record_order_delivered,
+    record_order_placed,
+    record_order_ready,
+)
+from dinedashapp.routing import suggest_bundles
+from dinedashapp.schedule import get_weekly_schedule
+from dinedashapp.tracking import (
+    clear_live_location,
+    get_live_coordinates,
+    set_live_location,
+)
 
 
 def check_authorization(user, target):
@@ -237,12 +299,14 @@ class RestaurantSearchView(ListView):
             kwargs["query"] = query
         if order_by := self.request.GET.get("order_by"):
             kwargs["order_by"] = order_by
-        if (
-            (user := self.request.user).is_authenticated
-            and user.user_type == "Reg"
-            and user.customer_info.location
-        ):
-            kwargs["user_has_location"] = True
+        kwargs["open_now"] = bool(self.request.GET.get("open_now"))
+        kwargs["favorites_only"] = bool(self.request.GET.get("favorites_only"))
+        if open_at := self.request.GET.get("open_at"):
+            kwargs["open_at"] = open_at
+        if (user := self.request.user).is_authenticated and user.user_type == "Reg":
+            kwargs["user_is_customer"] = True
+            if user.customer_info.location:
+                kwargs["user_has_location"] = True
         return kwargs
 
     def get_queryset(self):
@@ -260,6 +324,16 @@ class RestaurantSearchView(ListView):
                 Q(name__icontains=query) | Q(description__icontains=query)
             )
 
+        if open_at := self.get_open_at():
+            queryset = queryset.open_at(open_at)
+
+        user = self.request.user
+        is_customer = user.is_authenticated and user.user_type == "Reg"
+        if is_customer:
+            queryset = queryset.with_is_favorite(user)
+            if self.request.GET.get("favorites_only"):
+                queryset = queryset.filter(is_favorite=True)
+
         if (order_by := self.request.GET.get("order_by")) == "name":
             queryset = queryset.order_by("name")
         elif order_by == "-name":
@@ -274,15 +348,12 @@ class RestaurantSearchView(ListView):
             queryset = queryset.filter(average_rating__gt=0).order_by(
                 "average_rating", "name"
             )
+        elif order_by == "favorites_first" and is_customer:
+            queryset = queryset.order_by("-is_favorite", "name")
         else:
             queryset = queryset.order_by("name")
 
-        user = self.request.user
-        user_has_location = (
-            user.is_authenticated
-            and user.user_type == "Reg"
-            and user.customer_info.location
-        )
+        user_has_location = is_customer and user.customer_info.location
 
         if user_has_location:
             user_coordinates = (
@@ -310,84 +381,90 @@ class RestaurantSearchView(ListView):
 
         return result
 
+    def get_open_at(self):
+        """
+        Returns the time at which the restaurants should be open, or None if the
+        search isn't filtered by opening hours.
+        """
+        if self.request.GET.get("open_now"):
+            return datetime_now()
+        try:
+            open_at = parse_datetime(self.request.GET.get("open_at", ""))
+        except ValueError:
+            return None
+        if open_at is not None and is_naive(open_at):
+            open_at = make_aware(open_at)
+        return open_at
+
 
 class RestaurantInfoView(DetailView):
     model = Restaurant
     template_name = "dinedashapp/restaurant_info.html"
     context_object_name = "restaurant"
 
+    def get_queryset(self):
+        # The rating and the state of the current customer are loaded along with
+        # the restaurant, so showing them takes no extra queries.
+        queryset = Restaurant.objects.annotate(average_rating=Avg("reviews__rating"))
+        user = self.request.user
+        if user.is_authenticated and user.user_type == "Reg":
+            queryset = queryset.with_is_favorite(user).annotate(
+                has_reviewed=Exists(
+                    RestaurantReview.objects.filter(
+                        restaurant=OuterRef("pk"), user=user
+                    )
+                ),
+            )
+        return queryset
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = self.get_object()
+        obj = self.object
 
         user = self.request.user
         context["is_owner"] = (
-            user.is_authenticated and user.user_type == "Res" and user.restaurant == obj
+            user.is_authenticated and user.user_type == "Res" and obj.user_id == user.id
         )
 
-        context["sunday_hours"] = (
-            f"{obj.open_hour_sunday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_sunday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_sunday is not None
-            else "closed"
-        )
-        context["monday_hours"] = (
-            f"{obj.open_hour_monday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_monday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_monday is not None
-            else "closed"
-        )
-        context["tuesday_hours"] = (
-            f"{obj.open_hour_tuesday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_tuesday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_tuesday is not None
-            else "closed"
-        )
-        context["wednesday_hours"] = (
-            f"{obj.open_hour_wednesday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_wednesday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_wednesday is not None
-            else "closed"
-        )
-        context["thursday_hours"] = (
-            f"{obj.open_hour_thursday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_thursday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_thursday is not None
-            else "closed"
-        )
-        context["friday_hours"] = (
-            f"{obj.open_hour_friday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_friday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_friday is not None
-            else "closed"
-        )
-        context["saturday_hours"] = (
-            f"{obj.open_hour_saturday.strftime("%I:%M %p").lstrip("0")} to {obj.close_hour_saturday.strftime("%I:%M %p").lstrip("0")}"
-            if obj.open_hour_saturday is not None
-            else "closed"
-        )
+        schedule = get_weekly_schedule(obj.id)
+        context["hours"] = schedule.get_descriptions()
+        context["is_open_now"] = schedule.is_open(datetime_now())
 
-        context["average_rating"] = obj.get_average_rating()
+        context["average_rating"] = obj.average_rating
 
         if user.is_authenticated and user.user_type == "Reg":
-            context["is_favorite"] = (
-                obj in user.customer_info.favorite_restaurants.all()
-            )
+            context["is_favorite"] = obj.is_favorite
+            context["has_reviewed"] = obj.has_reviewed
 
-            if (
-                order := user.orders.annotate(order_item_count=Count("items"))
-                .filter(status=Order.OrderStatus.NOT_PLACED_YET, order_item_count__gt=0)
-                .first()
-            ):
+            if restaurant_ids := SessionCart(self.request.session).get_restaurant_ids():
                 context["url_for_order"] = reverse(
-                    "manage_order", kwargs={"pk": order.id}
+                    "cart",
+                    kwargs={
+                        "restaurant_id": (
+                            obj.id if obj.id in restaurant_ids else restaurant_ids[0]
+                        )
+                    },
                 )
 
         return context
 
 
 class ModifyFavoriteStatus(RegularUserRequiredMixin, View):
-    def get(self, request, *args, **kwargs):
+    """
+    Adds a restaurant to the customer's favorites or removes it. Sending the same
+    request again changes nothing, and the restaurant itself is never loaded.
+    """
+
+    def post(self, request, *args, **kwargs):
         restaurant_id = kwargs["pk"]
-        obj = Restaurant.objects.get(id=restaurant_id)
+        favorite_restaurants = self.request.user.customer_info.favorite_restaurants
         if kwargs["status"]:
-            obj.favorited_by.add(self.request.user.customer_info)
+            try:
+                favorite_restaurants.add(restaurant_id)
+            except IntegrityError as e:
+                raise Http404("No such restaurant.") from e
         else:
-            obj.favorited_by.remove(self.request.user.customer_info)
+            favorite_restaurants.remove(restaurant_id)
         return redirect("restaurant_info", restaurant_id)
 
 
@@ -403,6 +480,20 @@ class CreateMenuItemView(RestaurantUserRequiredMixin, CreateView):
         return redirect("restaurant_info", obj.restaurant.pk)
 
 
+class ImportMenuView(RestaurantUserRequiredMixin, FormView):
+    form_class = MenuImportForm
+    template_name = "dinedashapp/menu_import_form.html"
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["restaurant"] = self.request.user.restaurant
+        return kwargs
+
+    def form_valid(self, form):
+        form.save()
+        return redirect("restaurant_info", self.request.user.restaurant.pk)
+
+
 class EditMenuItemView(RestaurantUserRequiredMixin, UpdateView):
     model = MenuItem
     fields = ("name", "price", "description")
@@ -422,6 +513,25 @@ class EditRestaurantInfoView(RestaurantUserRequiredMixin, UpdateView):
     def get_object(self, queryset=None):
         return self.request.user.restaurant
 
+    @cached_property
+    def hours_formset(self):
+        if self.request.method == "POST":
+            return OpeningHoursFormSet(self.request.POST, instance=self.object)
+        return OpeningHoursFormSet(instance=self.object)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["hours_formset"] = self.hours_formset
+        return context
+
+    def form_valid(self, form):
+        if not self.hours_formset.is_valid():
+            return self.form_invalid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            self.hours_formset.save()
+        return response
+
     def get_success_url(self):
         return reverse(
             "restaurant_info", kwargs={"pk": self.request.user.restaurant.id}
@@ -533,9 +643,9 @@ class RegularAccountView(RegularUserRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["favorite_restaurants"] = (
-            self.request.user.customer_info.favorite_restaurants.all()
-        )
+        customer_info = self.request.user.customer_info
+        context["favorite_restaurants"] = customer_info.favorite_restaurants.all()
+        context["nearby_restaurants"] = get_nearby_restaurants(customer_info)
         return context
 
 
@@ -556,78 +666,82 @@ class EditDeliveryAccountDetailsView(DeliveryUserRequiredMixin, UpdateView):
     def get_object(self, queryset=None):
         return self.request.user.delivery_contractor_info
 
+    def form_valid(self, form):
+        if "location" in form.changed_data:
+            # The new location should be used until the contractor sends their
+            # position again.
+            clear_live_location(self.object.id)
+        return super().form_valid(form)
 
-class CreateOrderItemView(RegularUserRequiredMixin, CreateView):
-    model = OrderItem
-    form_class = CreateOrderItemForm
+
+class CreateOrderItemView(RegularUserRequiredMixin, FormView):
+    form_class = CartItemForm
     template_name = "dinedashapp/order_item_form.html"
 
-    def get(self, request, *args, **kwargs):
-        menu_item_id = kwargs["menu_item_id"]
-        order_item = (
-            OrderItem.objects.filter(
-                order__user=request.user,
-                menu_item_id=menu_item_id,
-                order__status=Order.OrderStatus.NOT_PLACED_YET,
-            )
-            .order_by("order__id")
-            .first()
+    @cached_property
+    def menu_item(self):
+        return MenuItem.objects.get(pk=self.kwargs["menu_item_id"])
+
+    @cached_property
+    def quantity_in_cart(self):
+        return (
+            SessionCart(self.request.session)
+            .get_quantities(self.menu_item.restaurant_id)
+            .get(self.menu_item.id)
         )
-        if order_item:
-            return redirect("edit_order_item", pk=order_item.pk)
-        return super().get(request, *args, **kwargs)
+
+    def get_initial(self):
+        initial = super().get_initial()
+        if self.quantity_in_cart:
+            initial["quantity"] = self.quantity_in_cart
+        return initial
 
     def get_context_data(self, **kwargs):
         kwargs = super().get_context_data(**kwargs)
-        kwargs["menu_item"] = MenuItem.objects.get(pk=self.kwargs["menu_item_id"])
+        kwargs["menu_item"] = self.menu_item
+        kwargs["editing"] = bool(self.quantity_in_cart)
         return kwargs
 
     def form_valid(self, form):
-        obj = form.save(False)
-        menu_item = MenuItem.objects.get(pk=self.kwargs["menu_item_id"])
-        order, _created = Order.objects.get_or_create(
-            restaurant_id=menu_item.restaurant.id,
-            user_id=self.request.user.id,
-            status=Order.OrderStatus.NOT_PLACED_YET,
+        restaurant_id = self.menu_item.restaurant_id
+        SessionCart(self.request.session).set_quantities(
+            restaurant_id, {self.menu_item.id: form.cleaned_data["quantity"]}
         )
-        obj.order_id = order.id
-        obj.menu_item_id = menu_item.id
-        obj.save()
-        return redirect("manage_order", order.id)
+        return redirect("cart", restaurant_id)
 
 
-class EditOrderItemView(RegularUserRequiredMixin, UpdateView):
-    model = OrderItem
-    fields = ("quantity",)
-    template_name = "dinedashapp/order_item_form.html"
+@deny_if_not_target("Reg")
+@require_POST
+def update_cart(request, restaurant_id):
+    form = CartChangesForm(request.POST, restaurant_id=restaurant_id)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+
+    cart = SessionCart(request.session)
+    cart.set_quantities(
+        restaurant_id,
+        {
+            menu_item.id: quantity
+            for menu_item, quantity in form.cleaned_data["items"].items()
+        },
+    )
+    total_cost = calc_total_cost(cart.get_menu_items(restaurant_id))
 
-    def get_queryset(self):
-        return (
-            super()
-            .get_queryset()
-            .filter(
-                order__user=self.request.user,
-                order__status=Order.OrderStatus.NOT_PLACED_YET,
-            )
-            .order_by("order__id")
-        )
+    return JsonResponse({"total_cost": f"{total_cost:.2f}"})
 
-    def get_context_data(self, **kwargs):
-        kwargs = super().get_context_data(**kwargs)
-        kwargs["menu_item"] = self.object.menu_item
-        kwargs["editing"] = True
-        return kwargs
 
-    def form_valid(self, form):
-        if form.cleaned_data["quantity"] == 0:
-            # pylint: disable=attribute-defined-outside-init
-            self.object = self.get_object()
-            self.object.delete()
-            return redirect(self.get_success_url())
-        return super().form_valid(form)
+class CartView(RegularUserRequiredMixin, TemplateView):
+    template_name = "dinedashapp/cart.html"
 
-    def get_success_url(self):
-        return reverse("manage_order", kwargs={"pk": self.object.order.id})
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        restaurant_id = self.kwargs["restaurant_id"]
+        context["restaurant"] = Restaurant.objects.get(pk=restaurant_id)
+        context["menu_items"] = menu_items = SessionCart(
+            self.request.session
+        ).get_menu_items(restaurant_id)
+        context["total_cost"] = calc_total_cost(menu_items)
+        return context
 
 
 class ManageOrder(RegularUserRequiredMixin, DetailView):
@@ -635,20 +749,27 @@ class ManageOrder(RegularUserRequiredMixin, DetailView):
     template_name = "dinedashapp/manage_order.html"
 
     def get_queryset(self):
-        return super().get_queryset().filter(user=self.request.user)
+        return (
+            super()
+            .get_queryset()
+            .filter(user=self.request.user)
+            .exclude(status=Order.OrderStatus.NOT_PLACED_YET)
+            .select_related("restaurant")
+        )
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return super().get_object(
+                ArchivedOrder.objects.filter(user=self.request.user).select_related(
+                    "restaurant"
+                )
+            )
 
 
 class PlaceOrderView(RegularUserRequiredMixin, CreateView):
-    model = Payment
-    fields = (
-        "payment_method",
-        "cardholder_name",
-        "billing_address",
-        "card_number",
-        "expiration_month",
-        "expiration_year",
-        "cvv",
-    )
+    form_class = PlaceOrderForm
     template_name = "dinedashapp/place_order_form.html"
 
     def dispatch(self, *args, **kwargs):
@@ -659,28 +780,48 @@ class PlaceOrderView(RegularUserRequiredMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         kwargs = super().get_context_data(**kwargs)
-        kwargs["order"] = Order.objects.get(
-            user=self.request.user,
-            pk=self.kwargs["order_id"],
-            status=Order.OrderStatus.NOT_PLACED_YET,
+        restaurant_id = self.kwargs["restaurant_id"]
+        kwargs["restaurant"] = Restaurant.objects.get(pk=restaurant_id)
+        kwargs["total_cost"] = calc_total_cost(
+            SessionCart(self.request.session).get_menu_items(restaurant_id)
         )
         return kwargs
 
+    def get_initial(self):
+        return {"placement_token": uuid4()}
+
     def form_valid(self, form):
         obj = form.save(False)
-        obj.order = order = Order.objects.get(
-            user=self.request.user,
-            pk=self.kwargs["order_id"],
-            status=Order.OrderStatus.NOT_PLACED_YET,
-        )
         obj.user = self.request.user
-        obj.amount_paid = order.total_cost = order.calc_total_cost()
-        obj.save()
-
-        order.status = Order.OrderStatus.PLACED
-        order.date_placed = datetime_now()
-        order.save()
+        restaurant_id = self.kwargs["restaurant_id"]
+        placement_token = form.cleaned_data["placement_token"]
+        cart = SessionCart(self.request.session)
 
+        # The order only gets written to the database now that it's being placed.
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(
+                    user=self.request.user,
+                    restaurant_id=restaurant_id,
+                    placement_token=placement_token,
+                )
+                order.set_item_quantities(cart.get_menu_items(restaurant_id))
+                if not order.place(obj):
+                    # The cart is empty, so the order shouldn't exist.
+                    transaction.set_rollback(True)
+                    return redirect("cart", restaurant_id)
+                record_order_placed(order)
+        except IntegrityError:
+            # The same form was submitted twice, and the other submission placed
+            # the order first.
+            order = Order.objects.filter(
+                user=self.request.user, placement_token=placement_token
+            ).first()
+            if order is None:
+                raise
+            return redirect("manage_order", pk=order.id)
+
+        cart.clear(restaurant_id)
         return redirect("manage_order", pk=order.id)
 
 
@@ -693,13 +834,17 @@ def restaurant_orders_list(request):
         and request.POST.get("action") == "mark_as_ready_for_pickup"
     ):
         order_id = int(request.POST.get("order_id"))
-        order = Order.objects.get(
-            pk=order_id,
-            restaurant=restaurant,
-            status=Order.OrderStatus.PLACED,
-        )
-        order.status = Order.OrderStatus.READY_FOR_PICKUP
-        order.save()
+        with transaction.atomic():
+            is_ready = Order.objects.filter(
+                pk=order_id, restaurant=restaurant
+            ).transition(Order.OrderStatus.READY_FOR_PICKUP, date_ready=datetime_now())
+            if is_ready:
+                record_order_ready(order_id)
+        if is_ready:
+            dispatch_order(
+                order_id,
+                (restaurant.location_x_coordinate, restaurant.location_y_coordinate),
+            )
 
     return render(
         request,
@@ -707,65 +852,16 @@ def restaurant_orders_list(request):
         {
             "orders": Order.objects.filter(
                 restaurant=restaurant, status=Order.OrderStatus.PLACED
-            )
+            ).prefetch_related("items")
         },
     )
 
 
-@deny_if_not_target("Del")
-@csrf_exempt
-def delivery_orders_list(request):
-    user = request.user.delivery_contractor_info
-    if request.method == "POST":
-        order_id = int(request.POST.get("order_id"))
-        status_queried = ""
-        match request.POST.get("action"):
-            case "accept":
-                order = Order.objects.get(
-                    pk=order_id,
-                    status=Order.OrderStatus.READY_FOR_PICKUP,
-                    accepted_by__isnull=True,
-                )
-                order.accepted_by = user
-                order.status = Order.OrderStatus.IN_TRANSIT
-                order.save()
-
-            case "reject":
-                order = Order.objects.exclude(accepted_by=user).get(pk=order_id)
-                order.rejected_by.add(user)
-
-            case "mark_as_delivered":
-                order = Order.objects.get(
-                    pk=order_id, status=Order.OrderStatus.IN_TRANSIT
-                )
-                order.status = Order.OrderStatus.DELIVERED
-                order.date_delivered = datetime_now()
-                order.save()
-
-                status_queried = "accepted"
-
-            case "set_minutes_away":
-                order = Order.objects.get(
-                    pk=order_id, status=Order.OrderStatus.IN_TRANSIT
-                )
-                try:
-                    order.minutes_away = int(request.POST.get("minutes_away", ""))
-                except ValueError:
-                    order.minutes_away = None
-                order.save()
-
-                status_queried = "accepted"
-
-    else:
-        status_queried = request.GET.get("status")
-
-    if status_queried == "accepted":
-        orders = user.accepted_orders.filter(status=Order.OrderStatus.IN_TRANSIT)
-    else:
-        orders = Order.objects.filter(
-            status=Order.OrderStatus.READY_FOR_PICKUP
-        ).exclude(id__in=user.rejected_orders.all())
-
+def get_orders_with_distances(orders, contractor):
+    """
+    Returns the orders as dicts that include how far the contractor is from the
+    restaurant and from the customer.
+    """
     orders = orders.values(
         "id",
         "restaurant__location",
@@ -777,12 +873,9 @@ def delivery_orders_list(request):
         "minutes_away",
     )
 
-    delivery_user_coordinates = (
-        user.location_x_coordinate,
-        user.location_y_coordinate,
-    )
+    delivery_user_coordinates = get_live_coordinates(contractor)
 
-    orders = map(
+    return map(
         lambda o: o
         | {
             "restaurant_distance_away": get_distance_in_miles(
@@ -803,6 +896,66 @@ def delivery_orders_list(request):
         orders,
     )
 
+
+def filter_orders_within_distance(orders, max_distance):
+    return filter(
+        lambda o: o["restaurant_distance_away"] <= max_distance
+        and o["user_distance_away"] <= max_distance,
+        orders,
+    )
+
+
+@deny_if_not_target("Del")
+@csrf_exempt
+def delivery_orders_list(request):
+    user = request.user.delivery_contractor_info
+    if request.method == "POST":
+        order_id = int(request.POST.get("order_id"))
+        status_queried = ""
+        match request.POST.get("action"):
+            case "accept":
+                # Only one contractor can win the race for an order, since the
+                # UPDATE only matches it while nobody has accepted it yet.
+                if (
+                    Order.objects.available_to(user)
+                    .filter(pk=order_id, accepted_by__isnull=True)
+                    .transition(
+                        Order.OrderStatus.IN_TRANSIT,
+                        accepted_by=user,
+                        date_accepted=datetime_now(),
+                    )
+                ):
+                    update_etas(user.id, get_live_coordinates(user), force=True)
+
+            case "reject":
+                # Only orders that are waiting to be picked up can be rejected, since
+                # rejections are deleted once an order isn't.
+                order = Order.objects.filter(
+                    pk=order_id, status=Order.OrderStatus.READY_FOR_PICKUP
+                ).first()
+                if order is not None:
+                    order.rejected_by.add(user)
+                    decline_offer(order_id, user)
+
+            case "mark_as_delivered":
+                with transaction.atomic():
+                    if Order.objects.filter(pk=order_id, accepted_by=user).transition(
+                        Order.OrderStatus.DELIVERED, date_delivered=datetime_now()
+                    ):
+                        record_order_delivered(order_id)
+
+                status_queried = "accepted"
+
+    else:
+        status_queried = request.GET.get("status")
+
+    if status_queried == "accepted":
+        orders = user.accepted_orders.filter(status=Order.OrderStatus.IN_TRANSIT)
+    else:
+        orders = Order.objects.available_to(user)
+
+    orders = get_orders_with_distances(orders, user)
+
     if status_queried == "accepted":
         return render(
             request,
@@ -818,11 +971,7 @@ def delivery_orders_list(request):
         }
     )
     max_distance = form.cleaned_data["max_distance"] if form.is_valid() else 5
-    orders = filter(
-        lambda o: o["restaurant_distance_away"] <= max_distance
-        and o["user_distance_away"] <= max_distance,
-        orders,
-    )
+    orders = filter_orders_within_distance(orders, max_distance)
 
     return render(
         request,
@@ -836,11 +985,211 @@ def delivery_orders_list(request):
     )
 
 
+@deny_if_not_target("Del")
+def delivery_order_bundles(request):
+    """
+    Suggests groups of nearby orders that can be delivered on one route, and lets
+    the contractor accept all of the orders in a group at once.
+    """
+    user = request.user.delivery_contractor_info
+    data = request.POST if request.method == "POST" else request.GET
+    bundle_taken = False
+    if request.method == "POST":
+        accept_form = AcceptBundleForm(request.POST)
+        if not accept_form.is_valid():
+            return HttpResponseBadRequest()
+        order_ids = set(accept_form.cleaned_data["order_id"])
+        # Either every order in the bundle is accepted or none of them are, in
+        # case another contractor accepted one of them first.
+        with transaction.atomic():
+            accepted = (
+                Order.objects.available_to(user)
+                .filter(pk__in=order_ids, accepted_by__isnull=True)
+                .transition(
+                    Order.OrderStatus.IN_TRANSIT,
+                    accepted_by=user,
+                    date_accepted=datetime_now(),
+                )
+            )
+            if accepted != len(order_ids):
+                transaction.set_rollback(True)
+                bundle_taken = True
+        if not bundle_taken:
+            update_etas(user.id, get_live_coordinates(user), force=True)
+            return redirect(reverse("delivery_orders") + "?status=accepted")
+
+    form = OrdersWithinDistanceForm({"max_distance": data.get("max_distance", 5)})
+    max_distance = form.cleaned_data["max_distance"] if form.is_valid() else 5
+    orders = filter_orders_within_distance(
+        get_orders_with_distances(Order.objects.available_to(user), user),
+        max_distance,
+    )
+
+    return render(
+        request,
+        "dinedashapp/delivery_order_bundles.html",
+        {
+            "bundles": suggest_bundles(orders, get_live_coordinates(user)),
+            "bundle_taken": bundle_taken,
+            "form": form,
+            "max_distance": max_distance,
+        },
+    )
+
+
+@deny_if_not_target("Del")
+@require_POST
+def update_delivery_location(request):
+    """
+    Records the contractor's current GPS position. Apps can call this every few
+    seconds, since it doesn't geocode anything and only writes to the database
+    occasionally. They send the CSRF token in the X-CSRFToken header.
+    """
+    form = LiveLocationForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+    # The coordinates are stored with six decimal places.
+    set_live_location(
+        request.user.delivery_contractor_info.id,
+        (
+            round(form.cleaned_data["latitude"], 6),
+            round(form.cleaned_data["longitude"], 6),
+        ),
+    )
+    return JsonResponse({})
+
+
+# Changes that were committed just after a feed was read can have timestamps from
+# just before it, so each feed overlaps the previous one by this much.
+ORDERS_FEED_OVERLAP = timedelta(seconds=5)
+
+
+@deny_if_not_target("Del")
+def delivery_orders_feed(request):
+    """
+    Returns the orders that are ready to be picked up as JSON. If a cursor from a
+    previous response is given as since, only the orders that became available
+    since then are included, along with the IDs of the nearby or offered orders
+    that were accepted or delivered since then, and of the orders that this
+    contractor rejected or whose offer to them ran out. Clients should remove
+    orders before adding the available ones, since an order can be in both lists.
+    """
+    form = OrdersFeedForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+    user = request.user.delivery_contractor_info
+    since = form.cleaned_data["since"]
+    read_at = datetime_now()
+    cursor = read_at - ORDERS_FEED_OVERLAP
+
+    max_distance = form.cleaned_data["max_distance"] or 5
+
+    available_orders = Order.objects.available_to(user, read_at)
+    removed_order_ids = set()
+    if since is not None:
+        # Besides orders that just became ready, orders can become available when
+        # the contractor's offer starts or when every offer has run out.
+        available_orders = available_orders.filter(
+            Q(date_status_changed__gt=since)
+            | Q(dispatch_ends_at__gt=since)
+            | Q(offers__contractor=user, offers__starts_at__gt=since)
+        ).distinct()
+        # Only the taken orders that the contractor could have been shown are sent,
+        # so the response doesn't grow with the number of orders everywhere.
+        taken_orders = Order.objects.filter(
+            status__in=(Order.OrderStatus.IN_TRANSIT, Order.OrderStatus.DELIVERED),
+            date_status_changed__gt=since,
+        )
+        removed_order_ids.update(
+            order["id"]
+            for order in filter_orders_within_distance(
+                get_orders_with_distances(
+                    # The distance to customers whose address wasn't found is
+                    # unknown.
+                    taken_orders.filter(
+                        user__customer_info__location_x_coordinate__isnull=False,
+                        user__customer_info__location_y_coordinate__isnull=False,
+                    ),
+                    user,
+                ),
+                max_distance,
+            )
+        )
+        removed_order_ids.update(
+            taken_orders.filter(offers__contractor=user).values_list("id", flat=True)
+        )
+        removed_order_ids.update(
+            user.rejections.filter(date_rejected__gt=since).values_list(
+                "order_id", flat=True
+            )
+        )
+        removed_order_ids.update(
+            user.offers.filter(ends_at__gt=since, ends_at__lte=read_at).values_list(
+                "order_id", flat=True
+            )
+        )
+
+    return JsonResponse(
+        {
+            "cursor": cursor.isoformat(),
+            "available": list(
+                filter_orders_within_distance(
+                    get_orders_with_distances(available_orders, user), max_distance
+                )
+            ),
+            "removed": sorted(removed_order_ids),
+        }
+    )
+
+
+# The heatmap only shows the busiest cells.
+DEMAND_HEATMAP_CELLS = 100
+
+
+@staff_member_required
+def demand_heatmap(request):
+    """
+    Shows where orders are usually placed during an hour of the week, so that
+    delivery contractors can be asked to wait there. It reads the cells written by
+    the build_demand_heatmap command instead of the orders.
+    """
+    current_time = localtime()
+    initial = {"weekday": current_time.weekday(), "hour": current_time.hour}
+    form = DemandHeatmapForm(request.GET or None, initial=initial)
+    selected = form.cleaned_data if form.is_valid() else initial
+
+    cells = [
+        {
+            "coordinates": get_cell_center(cell.cell_x, cell.cell_y),
+            "average_orders": cell.average_orders,
+        }
+        for cell in DemandCell.objects.filter(
+            hour_of_week=selected["weekday"] * 24 + selected["hour"]
+        ).order_by("-average_orders")[:DEMAND_HEATMAP_CELLS]
+    ]
+
+    return render(
+        request,
+        "dinedashapp/demand_heatmap.html",
+        {
+            "form": form,
+            "cells": cells,
+            "max_average_orders": cells[0]["average_orders"] if cells else 0,
+        },
+    )
+
+
 @deny_if_not_target("Reg")
 def regular_customer_orders_list(request):
     orders = (
         Order.objects.filter(user=request.user)
         .exclude(status=Order.OrderStatus.NOT_PLACED_YET)
+        .select_related("restaurant")
+        .order_by("-date_placed", "-id")
+    )
+    archived_orders = (
+        ArchivedOrder.objects.filter(user=request.user)
+        .select_related("restaurant")
         .order_by("-date_placed", "-id")
     )
     status_queried = request.GET.get("status")
@@ -850,8 +1199,12 @@ def regular_customer_orders_list(request):
         if form.is_valid():
             the_filter = Order.OrderStatus(status_queried).label.lower()
             orders = orders.filter(status=form.cleaned_data["status"])
+            archived_orders = archived_orders.filter(status=form.cleaned_data["status"])
     else:
         form = OrdersWithStatusForm()
+    orders = merge_history(
+        orders, archived_orders, key=lambda o: (o.date_placed, o.id), reverse=True
+    )
     return render(
         request,
         "dinedashapp/regular_customer_orders_list.html",
@@ -871,20 +1224,25 @@ class CreateTableView(RestaurantUserRequiredMixin, CreateView):
     template_name = "dinedashapp/restaurant_table_form.html"
     form_class = TableForm
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # With the restaurant set, the form checks that the table number isn't
+        # taken the same way on every database.
+        kwargs["instance"] = Table(restaurant=self.request.user.restaurant)
+        return kwargs
+
     def form_valid(self, form):
-        obj = form.save(False)
-        obj.restaurant = self.request.user.restaurant
         try:
-            obj.save()
-            return redirect("restaurant_tables")
-        except IntegrityError as e:
-            if "UNIQUE constraint failed" in str(e):
-                form.add_error(
-                    field="local_id",
-                    error="Your restaurant has another table with that number.",
-                )
-                return self.form_invalid(form)
-            raise e
+            with transaction.atomic():
+                form.save()
+        except IntegrityError:
+            # Another table was given the same number after the form was checked.
+            form.add_error(
+                field="local_id",
+                error="Your restaurant has another table with that number.",
+            )
+            return self.form_invalid(form)
+        return redirect("restaurant_tables")
 
 
 class ModifyTableView(RestaurantUserRequiredMixin, UpdateView):
@@ -897,6 +1255,30 @@ class ModifyTableView(RestaurantUserRequiredMixin, UpdateView):
         return Table.objects.filter(restaurant=self.request.user.restaurant)
 
 
+class EditFloorPlanView(RestaurantUserRequiredMixin, FormView):
+    form_class = FloorPlanFormSet
+    template_name = "dinedashapp/floor_plan_form.html"
+    success_url = reverse_lazy("restaurant_tables")
+
+    def get_initial(self):
+        return list(
+            Table.objects.filter(restaurant=self.request.user.restaurant).values(
+                "id", "local_id", "capacity"
+            )
+        )
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["restaurant"] = self.request.user.restaurant
+        return kwargs
+
+    def form_valid(self, form):
+        form.save()
+        # The bulk operations don't send the signals that clear the cache.
+        invalidate_table_availability(self.request.user.restaurant.id)
+        return super().form_valid(form)
+
+
 class DeleteTableView(RestaurantUserRequiredMixin, DeleteView):
     template_name = "dinedashapp/restaurant_table_confirm_delete.html"
     success_url = reverse_lazy("restaurant_tables")
@@ -949,6 +1331,24 @@ class CreateReservationView(RegularUserRequiredMixin, CreateView):
         return redirect("reservation_details", obj.id)
 
 
+@deny_if_not_target("Reg")
+def available_reservation_times(request, restaurant_id):
+    form = AvailableTimesForm(request.GET)
+    start_times = None
+    if form.is_valid():
+        start_times = get_available_start_times(
+            restaurant_id,
+            form.cleaned_data["date"],
+            form.cleaned_data["number_of_guests"],
+            timedelta(minutes=form.cleaned_data["minutes"]),
+        )
+    return render(
+        request,
+        "dinedashapp/available_reservation_times.html",
+        {"form": form, "start_times": start_times},
+    )
+
+
 class ReservationDetailsView(RegularUserRequiredMixin, DetailView):
     template_name = "dinedashapp/reservation_details.html"
     context_object_name = "reservation"
@@ -956,14 +1356,29 @@ class ReservationDetailsView(RegularUserRequiredMixin, DetailView):
     def get_queryset(self):
         return Reservation.objects.filter(user=self.request.user)
 
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return super().get_object(
+                ArchivedReservation.objects.filter(user=self.request.user)
+            )
+
 
 class ReservationsOfRegUserListView(RegularUserRequiredMixin, ListView):
     template_name = "dinedashapp/regular_reservations_list.html"
     context_object_name = "reservations"
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user).order_by(
-            "-start_date"
+        return merge_history(
+            Reservation.objects.filter(user=self.request.user)
+            .select_related("restaurant", "table")
+            .order_by("-start_date"),
+            ArchivedReservation.objects.filter(user=self.request.user)
+            .select_related("restaurant", "table")
+            .order_by("-start_date"),
+            key=lambda r: r.start_date,
+            reverse=True,
         )
 
 
@@ -974,10 +1389,21 @@ def reservations_list(request):
     if request.GET.get("status"):
         form = ReservationsFilteringForm(request.GET)
         if form.is_valid():
+            archived_reservations = ArchivedReservation.objects.filter(
+                restaurant=request.user.restaurant, status=form.cleaned_data["status"]
+            )
             reservations = reservations.filter(status=form.cleaned_data["status"])
             if date := form.cleaned_data.get("date"):
                 reservations = reservations.filter(start_date__date=date)
+                archived_reservations = archived_reservations.filter(
+                    start_date__date=date
+                )
             filtering = Reservation.ReservationStatus(form.cleaned_data["status"]).label
+            # Only filtered lists can reach back far enough to include archived
+            # reservations.
+            reservations = merge_history(
+                reservations, archived_reservations, key=lambda r: r.start_date
+            )
     else:
         form = ReservationsFilteringForm()
         reservations = reservations.filter(
@@ -992,6 +1418,28 @@ def reservations_list(request):
     )
 
 
+RESERVATION_MODIFIED_EMAIL_SUBJECT = "DineDash: Reservation Has Been Modified"
+
+
+def get_reservation_modified_email_text(request, reservation):
+    return (
+        f"Your reservation at {reservation.restaurant.name} for {format_reservation_datetime(reservation.start_date)} is now {reservation.get_status_display().lower()}. "
+        + (
+            (
+                f"Your table is #{reservation.table.local_id}."
+                if reservation.table is not None
+                else "Your reservation is currently not assigned to a table."
+            )
+            if reservation.status == Reservation.ReservationStatus.CONFIRMED
+            else ""
+        )
+        + f"\n\nYour reservation number is #{reservation.id}, and it can be accessed using the link below:\n"
+        + request.build_absolute_uri(
+            reverse("reservation_details", kwargs={"pk": reservation.id})
+        )
+    )
+
+
 @deny_if_not_target("Res")
 def modify_reservation(request, reservation_id):
     reservation = Reservation.objects.get(
@@ -999,29 +1447,14 @@ def modify_reservation(request, reservation_id):
     )
     if request.method == "POST":
         form = ModifyReservationForm(data=request.POST, instance=reservation)
-        if form.is_valid():
-            reservation = form.save()
-
-            email_text = (
-                f"Your reservation at {reservation.restaurant.name} for {format_reservation_datetime(reservation.start_date)} is now {reservation.get_status_display().lower()}. "
-                + (
-                    (
-                        f"Your table is #{reservation.table.local_id}."
-                        if reservation.table is not None
-                        else "Your reservation is currently not assigned to a table."
-                    )
-                    if reservation.status == Reservation.ReservationStatus.CONFIRMED
-                    else ""
-                )
-                + f"\n\nYour reservation number is #{reservation.id}, and it can be accessed using the link below:\n"
-                + request.build_absolute_uri(
-                    reverse("reservation_details", kwargs={"pk": reservation.id})
-                )
-            )
-
+        with transaction.atomic():
+            is_valid = form.is_valid()
+            if is_valid:
+                reservation = form.save()
+        if is_valid:
             send_mail(
-                "DineDash: Reservation Has Been Modified",
-                email_text,
+                RESERVATION_MODIFIED_EMAIL_SUBJECT,
+                get_reservation_modified_email_text(request, reservation),
                 None,
                 [reservation.user.email],
             )
@@ -1035,3 +1468,184 @@ def modify_reservation(request, reservation_id):
         "dinedashapp/modify_restaurant_reservation.html",
         {"form": form, "reservation": reservation},
     )
+
+
+# The number of menu items shown on the dashboard.
+DASHBOARD_TOP_ITEMS = 10
+
+
+@deny_if_not_target("Res")
+def restaurant_dashboard(request):
+    """
+    Shows a restaurant's sales and timings for each of the last few days. Only the
+    daily totals kept by rollups.py are read.
+    """
+    form = DashboardPeriodForm(request.GET or None)
+    days = form.cleaned_data["days"] if form.is_valid() else 30
+    restaurant = request.user.restaurant
+    first_day = localdate() - timedelta(days=days - 1)
+
+    daily_stats = restaurant.daily_stats.filter(day__gte=first_day)
+    total_stats = RestaurantDailyStats(
+        **daily_stats.aggregate(
+            **{
+                name: Sum(name, default=0)
+                for name in (
+                    "orders",
+                    "revenue",
+                    "prepared_orders",
+                    "preparation_seconds",
+                    "delivered_orders",
+                    "delivery_seconds",
+                )
+            }
+        )
+    )
+    top_items = (
+        MenuItemDailyStats.objects.filter(restaurant=restaurant, day__gte=first_day)
+        .values("name")
+        .annotate(total_quantity=Sum("quantity"), total_revenue=Sum("revenue"))
+        .order_by("-total_quantity", "name")[:DASHBOARD_TOP_ITEMS]
+    )
+
+    return render(
+        request,
+        "dinedashapp/restaurant_dashboard.html",
+        {
+            "form": form,
+            "daily_stats": daily_stats.order_by("-day"),
+            "total_stats": total_stats,
+            "top_items": top_items,
+        },
+    )
+
+
+@deny_if_not_target("Res")
+def export_history(request):
+    if not request.GET:
+        form = ExportHistoryForm()
+    elif (form := ExportHistoryForm(request.GET)).is_valid():
+        restaurant = request.user.restaurant
+        start_date = end_date = None
+        if first_date := form.cleaned_data["first_date"]:
+            start_date = get_day_bounds(first_date)[0]
+        if last_date := form.cleaned_data["last_date"]:
+            end_date = get_day_bounds(last_date)[1]
+
+        if form.cleaned_data["data"] == "orders":
+            records = iter_orders(restaurant, start_date, end_date)
+            to_dict, iter_csv_rows = order_to_dict, iter_order_csv_rows
+        else:
+            records = iter_reservations(restaurant, start_date, end_date)
+            to_dict, iter_csv_rows = reservation_to_dict, iter_reservation_csv_rows
+
+        # The rows are sent as they are read, so memory use doesn't depend on how
+        # much history the restaurant has.
+        if (file_format := form.cleaned_data["file_format"]) == "csv":
+            response = StreamingHttpResponse(
+                stream_csv(iter_csv_rows(records)), content_type="text/csv"
+            )
+        else:
+            response = StreamingHttpResponse(
+                stream_json(map(to_dict, records)), content_type="application/json"
+            )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{form.cleaned_data["data"]}.{file_format}"'
+        )
+        return response
+
+    return render(request, "dinedashapp/export_history_form.html", {"form": form})
+
+
+@deny_if_not_target("Res")
+def assign_tables(request):
+    restaurant = request.user.restaurant
+    assigned_reservations = unassigned_reservations = None
+
+    if request.method == "POST":
+        form = AssignTablesForm(request.POST)
+        if form.is_valid():
+            range_start = get_day_bounds(form.cleaned_data["first_date"])[0]
+            range_end = get_day_bounds(form.cleaned_data["last_date"])[1]
+
+            with transaction.atomic():
+                pending_reservations = list(
+                    Reservation.objects.select_for_update()
+                    .filter(
+                        restaurant=restaurant,
+                        status=Reservation.ReservationStatus.PENDING,
+                        start_date__gte=max(range_start, datetime_now()),
+                        start_date__lt=range_end,
+                    )
+                    .select_related("user", "restaurant")
+                )
+                tables = {
+                    table.id: table
+                    for table in Table.objects.filter(restaurant=restaurant)
+                }
+                # Pending reservations can run past the end of the range, so the
+                # reservations that start before the last of them ends can overlap.
+                occupied_end = max(
+                    [range_end, *(r.end_date for r in pending_reservations)]
+                )
+                # Pending reservations are included since a table may have been
+                # assigned to one without confirming it.
+                occupied_intervals = (
+                    Reservation.objects.filter(
+                        restaurant=restaurant,
+                        table__isnull=False,
+                        start_date__lt=occupied_end,
+                        end_date__gt=range_start,
+                    )
+                    .exclude(status=Reservation.ReservationStatus.CANCELED)
+                    .exclude(id__in=[r.id for r in pending_reservations])
+                    .values_list("table_id", "start_date", "end_date")
+                )
+
+                assignments = plan_table_assignments(
+                    [(table.capacity, table.id) for table in tables.values()],
+                    occupied_intervals,
+                    pending_reservations,
+                )
+                for reservation, table_id in assignments:
+                    reservation.table = tables[table_id]
+                    reservation.status = Reservation.ReservationStatus.CONFIRMED
+                Reservation.objects.bulk_update(
+                    [reservation for reservation, _table_id in assignments],
+                    ["table", "status"],
+                )
+
+            # bulk_update() doesn't send the signals that clear the cache.
+            invalidate_table_availability(
+                restaurant.id, get_days(range_start, occupied_end)
+            )
+
+            assigned_reservations = [
+                reservation for reservation, _table_id in assignments
+            ]
+            assigned_ids = {reservation.id for reservation in assigned_reservations}
+            unassigned_reservations = [
+                r for r in pending_reservations if r.id not in assigned_ids
+            ]
+            # All of the emails are sent over a single connection.
+            send_mass_mail(
+                (
+                    RESERVATION_MODIFIED_EMAIL_SUBJECT,
+                    get_reservation_modified_email_text(request, reservation),
+                    None,
+                    [reservation.user.email],
+                )
+                for reservation in assigned_reservations
+            )
+    else:
+        form = AssignTablesForm()
+
+    return render(
+        request,
+        "dinedashapp/assign_tables_form.html",
+        {
+            "form": form,
+            "assigned_reservations": assigned_reservations,
+            "unassigned_reservations": unassigned_reservations,
+        },
+    )
@@ -131,6 +131,32 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # changed after the first migration.
 AUTH_USER_MODEL = "dinedashapp.User"
 
+# Carts are stored in the session, so using a cache-backed or cookie-based session
+# engine keeps adding items to an order from writing to the database at all.
+SESSION_ENGINE = config("SESSION_ENGINE", default="django.contrib.sessions.backends.db")
+
+# The free tables of each day, the restaurants' opening hours and the contractors'
+# live positions are kept in the cache, so every worker process must use the same
+# one. The database cache needs no other services, but its table has to be created
+# with the createcachetable command. Set CACHE_BACKEND and CACHE_LOCATION to use
+# something faster, such as Redis or Memcached.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="dinedash_cache"),
+    }
+}
+
+# Delivered orders and finished reservations older than this are moved to the
+# archive tables by the archive_history command.
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", cast=int, default=365)
+
+# The speed used to estimate how far away deliveries are until enough orders have
+# been delivered to learn the actual average speed.
+DELIVERY_SPEED_MPH = config("DELIVERY_SPEED_MPH", cast=float, default=20)
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"